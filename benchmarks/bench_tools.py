@@ -0,0 +1,113 @@
+"""Measure ``tools`` node throughput against pools of fake MCP servers.
+
+    python -m benchmarks.bench_tools --pool-sizes 1 2 4 --latency-ms 50
+
+Each round sends one AIMessage carrying ``--calls`` tool calls through a
+``ToolNode`` built from ``load_mcp_tools`` over an ``MCPSessionPool``, once
+per ``--transports`` entry (stdio child processes or in-process servers).
+With ``--latency-ms 0`` what is left is the transport's own overhead.
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+
+from langchain_core.messages import AIMessage
+from langgraph.graph import StateGraph, MessagesState, START, END
+from langgraph.prebuilt import ToolNode
+
+from src.mcp.inprocess import mcp_inprocess_context
+from src.mcp.mcp_client_utils import mcp_server_context, load_mcp_tools
+from src.mcp.session_pool import MCPSessionPool
+from benchmarks.fake_mcp_server import ARTICLES, create_server
+
+
+def _tool_calls(n: int) -> list[dict]:
+    titles = list(ARTICLES)
+    return [
+        {
+            "name": "get_summary",
+            "args": {"title": titles[i % len(titles)]},
+            "id": f"call_{i}",
+            "type": "tool_call",
+        }
+        for i in range(n)
+    ]
+
+
+def _session_factory(transport: str, args):
+    if transport == "inprocess":
+        kwargs = {"latency_ms": args.latency_ms}
+        return lambda: mcp_inprocess_context(create_server, kwargs)
+    server_args = ["-m", "benchmarks.fake_mcp_server", "--latency-ms", str(args.latency_ms)]
+    return lambda: mcp_server_context(sys.executable, server_args)
+
+
+async def bench_pool(transport: str, pool_size: int, args) -> dict:
+    start = time.perf_counter()
+    pool = MCPSessionPool(
+        _session_factory(transport, args),
+        size=pool_size,
+        max_concurrency=args.session_concurrency,
+    )
+    async with pool:
+        startup = time.perf_counter() - start
+        tools = await load_mcp_tools(pool, timeout=args.timeout)
+        workflow = StateGraph(MessagesState)
+        workflow.add_node("tools", ToolNode(tools))
+        workflow.add_edge(START, "tools")
+        workflow.add_edge("tools", END)
+        tool_node = workflow.compile()
+        message = AIMessage(content="", tool_calls=_tool_calls(args.calls))
+
+        await tool_node.ainvoke({"messages": [message]})  # warm-up
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            await tool_node.ainvoke({"messages": [message]})
+        elapsed = time.perf_counter() - start
+
+    total_calls = args.calls * args.rounds
+    return {
+        "transport": transport,
+        "pool_size": pool_size,
+        "startup_ms": startup * 1000,
+        "calls": total_calls,
+        "seconds": elapsed,
+        "calls_per_second": total_calls / elapsed,
+        "ms_per_round": elapsed / args.rounds * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument(
+        "--transports",
+        nargs="+",
+        choices=["stdio", "inprocess"],
+        default=["stdio", "inprocess"],
+    )
+    parser.add_argument("--calls", type=int, default=8, help="tool calls per AIMessage")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--session-concurrency", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    print(
+        f"{'transport':>9} {'pool':>4} {'start ms':>8} {'calls':>6} "
+        f"{'calls/s':>9} {'ms/round':>9}"
+    )
+    for transport in args.transports:
+        for size in args.pool_sizes:
+            r = await bench_pool(transport, size, args)
+            print(
+                f"{r['transport']:>9} {r['pool_size']:>4} {r['startup_ms']:>8.0f} "
+                f"{r['calls']:>6} {r['calls_per_second']:>9.1f} "
+                f"{r['ms_per_round']:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
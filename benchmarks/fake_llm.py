@@ -0,0 +1,251 @@
+"""Deterministic chat models that stand in for Groq/Ollama in benchmarks.
+
+Each fake waits ``latency_ms`` (plus prompt tokens at
+``prefill_tokens_per_second``, if set) before its first token and then emits
+tokens at ``tokens_per_second``. Context models follow a tool-call script,
+one round per call, before answering "Done."; asked small talk (which only
+happens in the single-pass layout) they answer right away.
+
+``slow_fraction`` of the calls take ``slow_latency_ms`` instead of
+``latency_ms`` and ``error_fraction`` of them fail, to exercise hedging and
+circuit breaking across providers.
+
+With ``prefix_cache_slots`` the fakes mimic a local server's KV cache: each
+slot remembers the last prompt it evaluated, and the longest prefix shared
+with one of them is neither charged prefill time nor counted as evaluated.
+"""
+
+import json
+import random
+import asyncio
+import time
+from os.path import commonprefix
+from typing import Any, AsyncIterator, Iterator, List, Optional, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableLambda
+from pydantic import PrivateAttr
+
+from benchmarks.fake_mcp_server import ARTICLES
+
+DEFAULT_TOOL_SCRIPT = [
+    [{"name": "search_wikipedia", "args": {"query": "{question}"}}],
+    [{"name": "get_summary", "args": {"title": "{title}"}}],
+]
+ARTICLE_TOOL_SCRIPT = [
+    [{"name": "search_wikipedia", "args": {"query": "{question}"}}],
+    [{"name": "get_article", "args": {"title": "{title}"}}],
+]
+
+SMALL_TALK = {"hi", "hello", "hey", "thanks", "thank you", "bye"}
+
+LOREM = (
+    "According to the Wikipedia article the subject is well documented and "
+    "the key facts are summarized in the snapshots above with dates names "
+    "and places drawn directly from the retrieved sources"
+).split()
+
+
+def _question(messages: List[BaseMessage]) -> str:
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            return message.content if isinstance(message.content, str) else ""
+    return ""
+
+
+def _tool_rounds(messages: List[BaseMessage]) -> int:
+    rounds = 0
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            break
+        if isinstance(message, AIMessage) and message.tool_calls:
+            rounds += 1
+    return rounds
+
+
+def _best_title(question: str) -> str:
+    words = {w.strip("?.,!").casefold() for w in question.split()}
+    return max(
+        ARTICLES,
+        key=lambda title: len(words & {w.casefold() for w in title.split()}),
+    )
+
+
+class FakeChatModel(BaseChatModel):
+    role: str = "reply"
+    latency_ms: float = 200.0
+    tokens_per_second: float = 200.0
+    prefill_tokens_per_second: float = 0.0
+    answer_tokens: int = 150
+    tool_script: List[List[dict]] = DEFAULT_TOOL_SCRIPT
+    route: Optional[str] = None
+    prefix_cache_slots: int = 0
+    slow_fraction: float = 0.0
+    slow_latency_ms: float = 3000.0
+    error_fraction: float = 0.0
+    seed: int = 0
+    _random: random.Random = PrivateAttr(default=None)
+    _slots: List[str] = PrivateAttr(default_factory=list)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-benchmark-chat-model"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeChatModel":
+        return self
+
+    def _latency_seconds(self) -> float:
+        """First-byte latency of one call; raises for an injected failure."""
+        if self._random is None:
+            self._random = random.Random(self.seed)
+        if self._random.random() < self.error_fraction:
+            raise RuntimeError("Injected provider failure")
+        if self._random.random() < self.slow_fraction:
+            return self.slow_latency_ms / 1000
+        return self.latency_ms / 1000
+
+    def with_structured_output(self, schema: Any, **kwargs: Any):
+        async def _route(messages: List[BaseMessage]):
+            await asyncio.sleep(self._latency_seconds())
+            step = self.route
+            if step is None:
+                question = _question(messages).strip(" !.?").casefold()
+                step = "reply" if question in SMALL_TALK else "context"
+            return schema(step=step)
+
+        return RunnableLambda(_route)
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        question = _question(messages)
+        rounds = _tool_rounds(messages)
+        small_talk = question.strip(" !.?").casefold() in SMALL_TALK
+        if self.role == "context" and not (small_talk and rounds == 0):
+            if rounds < len(self.tool_script):
+                values = {"question": question, "title": _best_title(question)}
+                tool_calls = [
+                    {
+                        "name": call["name"],
+                        "args": {
+                            k: v.format(**values) if isinstance(v, str) else v
+                            for k, v in call["args"].items()
+                        },
+                        "id": f"call_{rounds}_{i}",
+                        "type": "tool_call",
+                    }
+                    for i, call in enumerate(self.tool_script[rounds])
+                ]
+                return AIMessage(content="", tool_calls=tool_calls)
+            return AIMessage(content="Done.")
+
+        words = [LOREM[i % len(LOREM)] for i in range(self.answer_tokens)]
+        return AIMessage(content=" ".join(words))
+
+    def _usage(
+        self, messages: List[BaseMessage], response: AIMessage, cached: int
+    ) -> dict:
+        input_tokens = sum(len(str(m.content)) for m in messages) // 4
+        output_tokens = len(str(response.content).split()) + len(response.tool_calls)
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "input_token_details": {"cache_read": min(cached, input_tokens)},
+        }
+
+    def _cached_tokens(self, messages: List[BaseMessage]) -> int:
+        if not self.prefix_cache_slots:
+            return 0
+        prompt = "".join(f"{m.type}:{m.content}\n" for m in messages)
+        best = max(self._slots, key=lambda p: len(commonprefix([p, prompt])), default="")
+        cached = len(commonprefix([best, prompt])) // 4
+        # The slot that served the prompt now holds it; the least recently
+        # used slot is evicted.
+        if best in self._slots:
+            self._slots.remove(best)
+        self._slots.append(prompt)
+        del self._slots[: -self.prefix_cache_slots]
+        return cached
+
+    def _prefill(self, messages: List[BaseMessage]) -> Tuple[float, int]:
+        """Seconds spent evaluating the prompt and the prompt tokens reused."""
+        cached = self._cached_tokens(messages)
+        if not self.prefill_tokens_per_second:
+            return 0.0, cached
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        return max(0, prompt_tokens - cached) / self.prefill_tokens_per_second, cached
+
+    def _output_seconds(self, response: AIMessage) -> float:
+        tokens = len(str(response.content).split()) or 1
+        return tokens / self.tokens_per_second
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        response = self._respond(messages)
+        prefill, cached = self._prefill(messages)
+        time.sleep(self._latency_seconds() + prefill + self._output_seconds(response))
+        response.usage_metadata = self._usage(messages, response, cached)
+        response.response_metadata = {"prompt_eval_duration": int(prefill * 1e9)}
+        return ChatResult(generations=[ChatGeneration(message=response)])
+
+    async def _agenerate(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> ChatResult:
+        response = self._respond(messages)
+        prefill, cached = self._prefill(messages)
+        await asyncio.sleep(
+            self._latency_seconds() + prefill + self._output_seconds(response)
+        )
+        response.usage_metadata = self._usage(messages, response, cached)
+        response.response_metadata = {"prompt_eval_duration": int(prefill * 1e9)}
+        return ChatResult(generations=[ChatGeneration(message=response)])
+
+    def _chunks(self, messages) -> Iterator[Tuple[float, ChatGenerationChunk]]:
+        """Stream chunks, each with the seconds to wait before emitting it."""
+        response = self._respond(messages)
+        prefill, cached = self._prefill(messages)
+        delay = self._latency_seconds() + prefill
+        if response.tool_calls:
+            chunk = AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {
+                        "name": call["name"],
+                        "args": json.dumps(call["args"]),
+                        "id": call["id"],
+                        "index": i,
+                    }
+                    for i, call in enumerate(response.tool_calls)
+                ],
+            )
+            yield delay, ChatGenerationChunk(message=chunk)
+            delay = 0.0
+        else:
+            words = str(response.content).split(" ")
+            for i, word in enumerate(words):
+                text = word if i == 0 else f" {word}"
+                yield delay + 1 / self.tokens_per_second, ChatGenerationChunk(
+                    message=AIMessageChunk(content=text)
+                )
+                delay = 0.0
+        yield delay, ChatGenerationChunk(
+            message=AIMessageChunk(
+                content="",
+                usage_metadata=self._usage(messages, response, cached),
+                response_metadata={"prompt_eval_duration": int(prefill * 1e9)},
+            )
+        )
+
+    def _stream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> Iterator[ChatGenerationChunk]:
+        for delay, chunk in self._chunks(messages):
+            time.sleep(delay)
+            yield chunk
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        for delay, chunk in self._chunks(messages):
+            await asyncio.sleep(delay)
+            yield chunk
@@ -0,0 +1,114 @@
+"""A local stand-in for ``wikipedia_mcp`` serving canned articles.
+
+Run it the same way the real server is run::
+
+    python -m benchmarks.fake_mcp_server --latency-ms 50
+
+Tools are synchronous and sleep for ``--latency-ms`` before answering, so a
+single server process handles one call at a time, like a server blocked on
+an upstream HTTP request.
+"""
+
+import argparse
+import time
+from typing import Any, Dict, Optional
+
+from mcp.server.fastmcp import FastMCP
+
+ARTICLES = {
+    "Mohammed VI of Morocco": (
+        "Mohammed VI is the King of Morocco. He ascended the throne on "
+        "23 July 1999 upon the death of his father, King Hassan II."
+    ),
+    "Emmanuel Macron": (
+        "Emmanuel Macron is a French politician who has served as President "
+        "of France since 14 May 2017."
+    ),
+    "Parliament of Morocco": (
+        "The Parliament of Morocco is the bicameral legislature of Morocco, "
+        "consisting of the House of Representatives and the House of Councillors."
+    ),
+    "Albert Einstein": (
+        "Albert Einstein was a German-born theoretical physicist who is best "
+        "known for developing the theory of relativity."
+    ),
+    "Python (programming language)": (
+        "Python is a high-level, general-purpose programming language. Its "
+        "design philosophy emphasizes code readability."
+    ),
+}
+
+
+def _url(title: str) -> str:
+    return f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}"
+
+
+def _find(title: str) -> Optional[str]:
+    for name in ARTICLES:
+        if name.casefold() == title.strip().casefold():
+            return name
+    return None
+
+
+def create_server(latency_ms: float = 0.0, article_repeat: int = 20) -> FastMCP:
+    server = FastMCP("Wikipedia", log_level="WARNING")
+    delay = latency_ms / 1000
+
+    @server.tool()
+    def search_wikipedia(query: str, limit: int = 10) -> Dict[str, Any]:
+        """Search Wikipedia for articles matching a query."""
+        time.sleep(delay)
+        words = {w.casefold() for w in query.split()}
+        results = [
+            {"title": title, "snippet": text[:120], "pageid": i}
+            for i, (title, text) in enumerate(ARTICLES.items())
+            if words & {w.casefold() for w in f"{title} {text}".split()}
+        ][:limit]
+        return {
+            "query": query,
+            "results": results,
+            "status": "success" if results else "no_results",
+            "count": len(results),
+            "language": "en",
+        }
+
+    @server.tool()
+    def get_summary(title: str) -> Dict[str, Any]:
+        """Get a summary of a Wikipedia article."""
+        time.sleep(delay)
+        name = _find(title)
+        if name is None:
+            return {"title": title, "summary": None, "error": "No article found"}
+        return {"title": name, "summary": ARTICLES[name]}
+
+    @server.tool()
+    def get_article(title: str) -> Dict[str, Any]:
+        """Get the full content of a Wikipedia article."""
+        time.sleep(delay)
+        name = _find(title)
+        if name is None:
+            return {"title": title, "exists": False, "error": "Page does not exist"}
+        return {
+            "title": name,
+            "summary": ARTICLES[name],
+            "text": "\n\n".join([ARTICLES[name]] * article_repeat),
+            "url": _url(name),
+            "sections": [],
+            "categories": [],
+            "links": [],
+            "exists": True,
+        }
+
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Wikipedia MCP server")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--article-repeat", type=int, default=20)
+    args = parser.parse_args()
+    create_server(args.latency_ms, args.article_repeat).run(transport="stdio")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+"""Offline end-to-end benchmark of ``/api/v1/chat``.
+
+Starts the real FastAPI app under uvicorn with fake chat models and a fake
+Wikipedia MCP server, then drives it over HTTP at a fixed concurrency:
+
+    python -m benchmarks.run --requests 200 --concurrency 16 --llm-latency-ms 200
+
+Reports latency percentiles, time to first byte and to first answer text,
+requests/s and time spent in each graph node.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import socket
+import asyncio
+import argparse
+import tempfile
+import statistics
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+import uvicorn
+from langchain_core.callbacks import BaseCallbackHandler
+
+from benchmarks.fake_mcp_server import ARTICLES
+from benchmarks.fake_llm import ARTICLE_TOOL_SCRIPT, FakeChatModel
+
+
+class NodeTimer(BaseCallbackHandler):
+    """Collects wall time per graph node from LangChain chain callbacks."""
+
+    run_inline = True
+
+    def __init__(self):
+        self._starts: Dict[object, tuple] = {}
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+
+    def on_chain_start(
+        self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs
+    ):
+        node = (metadata or {}).get("langgraph_node")
+        # Runnables wrapped by a node (e.g. ToolNode) share its name; skip them.
+        parent = self._starts.get(parent_run_id)
+        if node and kwargs.get("name") == node and not (parent and parent[0] == node):
+            self._starts[run_id] = (node, time.perf_counter())
+
+    def _finish(self, run_id):
+        started = self._starts.pop(run_id, None)
+        if started:
+            node, start = started
+            self.durations[node].append(time.perf_counter() - start)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _questions(small_talk_every: int) -> List[str]:
+    questions = []
+    for i, title in enumerate(ARTICLES, start=1):
+        questions.append(f"Who or what is {title}?")
+        if small_talk_every and i % small_talk_every == 0:
+            questions.append("hi")
+    return questions
+
+
+def configure_environment(args, workdir: str):
+    server_args = [
+        "-m",
+        "benchmarks.fake_mcp_server",
+        "--latency-ms",
+        str(args.mcp_latency_ms),
+        "--article-repeat",
+        str(args.article_repeat),
+    ]
+    os.environ.update(
+        {
+            "GROQ_API_KEY": "",
+            "LLM_WARMUP": "false",
+            "MCP_SERVER_COMMAND": sys.executable,
+            "MCP_SERVER_ARGS": json.dumps(server_args),
+            "MCP_TRANSPORT": args.mcp_transport,
+            "MCP_SERVER_FACTORY": "benchmarks.fake_mcp_server:create_server",
+            "MCP_SERVER_KWARGS": json.dumps(
+                {
+                    "latency_ms": args.mcp_latency_ms,
+                    "article_repeat": args.article_repeat,
+                }
+            ),
+            "MCP_POOL_SIZE": str(args.mcp_pool_size),
+            "CHECKPOINT_DB_PATH": os.path.join(workdir, "checkpoints.db"),
+            "TOOL_CACHE_ENABLED": str(args.tool_cache).lower(),
+            "TOOL_CACHE_PATH": os.path.join(workdir, "tool_cache.db"),
+            "TOOL_SCHEMA_CACHE_PATH": os.path.join(workdir, "tool_schemas.json"),
+            "ANSWER_CACHE_ENABLED": str(args.answer_cache).lower(),
+            "COALESCE_REQUESTS": str(args.coalesce).lower(),
+            "ROUTER_FAST_PATH_ENABLED": str(not args.no_fast_path).lower(),
+            "SPECULATIVE_SEARCH_ENABLED": str(args.speculative_search).lower(),
+            "PASSAGE_REDUCTION_ENABLED": str(not args.no_reduce).lower(),
+            "GRAPH_TOPOLOGY": args.topology,
+            "ADMISSION_MAX_CONCURRENT": str(args.max_concurrent),
+            "ADMISSION_MAX_QUEUE": str(args.max_queue),
+            "BATCH_MAX_ITEMS": str(max(args.requests, 1)),
+            "BATCH_MAX_CONCURRENCY": str(args.concurrency),
+            # The fake models run as the "ollama" provider, with "groq" as
+            # the fallback when asked for.
+            "LLM_PROVIDERS": json.dumps(
+                ["ollama", "groq"] if args.fallback else ["ollama"]
+            ),
+            "LLM_HEDGE_ENABLED": str(not args.no_hedge).lower(),
+            "LLM_MAX_CONCURRENCY": json.dumps(
+                {"ollama": args.llm_concurrency, "groq": args.llm_concurrency}
+                if args.llm_concurrency
+                else {}
+            ),
+        }
+    )
+    from src.core.config import get_settings
+
+    get_settings.cache_clear()
+
+
+def install_fake_llms(args):
+    from src.core.llm import get_llm_registry
+
+    registry = get_llm_registry()
+    common = {
+        "latency_ms": args.llm_latency_ms,
+        "tokens_per_second": args.tokens_per_second,
+        "prefill_tokens_per_second": args.prefill_tokens_per_second,
+        "prefix_cache_slots": args.prefix_cache_slots,
+    }
+    if args.tool_script == "article":
+        common["tool_script"] = ARTICLE_TOOL_SCRIPT
+    # Only the preferred provider misbehaves.
+    faults = {
+        "slow_fraction": args.slow_fraction,
+        "slow_latency_ms": args.slow_latency_ms,
+        "error_fraction": args.error_fraction,
+    }
+    for role in ("router", "context", "synthesize", "reply"):
+        registry.override(
+            role,
+            FakeChatModel(
+                role=role, answer_tokens=args.answer_tokens, **common, **faults
+            ),
+            provider="ollama",
+        )
+        registry.override(
+            role,
+            FakeChatModel(role=role, answer_tokens=args.answer_tokens, **common),
+            provider="groq",
+        )
+
+
+async def _one_request(client: httpx.AsyncClient, url: str, payload: dict) -> dict:
+    start = time.perf_counter()
+    first_byte = first_answer = None
+    error = False
+    received = 0
+    async with client.stream("POST", url, json=payload) as response:
+        ndjson = "ndjson" in response.headers.get("content-type", "")
+        async for line in response.aiter_lines():
+            now = time.perf_counter()
+            received += len(line.encode()) + 1
+            if first_byte is None:
+                first_byte = now - start
+            if ndjson:
+                data = line
+            elif line.startswith("data: "):
+                data = line[6:]
+            else:
+                continue
+            if data.startswith("[ERROR]") or data.startswith('{"error"'):
+                error = True
+            elif first_answer is None and ('"delta"' in data or '"content"' in data):
+                first_answer = now - start
+    return {
+        "latency": time.perf_counter() - start,
+        "ttfb": first_byte or 0.0,
+        "ttfa": first_answer,
+        "bytes": received,
+        "error": error or response.status_code not in (200, 429),
+        "rejected": response.status_code == 429,
+    }
+
+
+async def drive(args, base_url: str) -> dict:
+    questions = _questions(args.small_talk_every)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    results: List[dict] = []
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+
+    async with httpx.AsyncClient(timeout=None, limits=limits) as client:
+
+        async def run(i: int):
+            payload = {
+                "message": questions[i % len(questions)],
+                "thread_id": f"bench-{i}",
+                "stream_tokens": args.stream_tokens,
+                "stream_protocol": args.protocol,
+                "stream_format": "ndjson" if args.ndjson else "sse",
+            }
+            async with semaphore:
+                results.append(
+                    await _one_request(client, f"{base_url}/api/v1/chat", payload)
+                )
+
+        start = time.perf_counter()
+        await asyncio.gather(*(run(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - start
+
+    return _summarize(results, elapsed)
+
+
+async def drive_batch(args, base_url: str) -> dict:
+    """All questions in one /chat/batch request.
+
+    ``latency`` is the server-side time of each question and ``ttfb``/``ttfa``
+    the time until its result line arrived.
+    """
+    questions = _questions(args.small_talk_every)
+    payload = {
+        "messages": [questions[i % len(questions)] for i in range(args.requests)],
+        "concurrency": args.concurrency,
+    }
+    results: List[dict] = []
+
+    async with httpx.AsyncClient(timeout=None) as client:
+        start = time.perf_counter()
+        async with client.stream(
+            "POST", f"{base_url}/api/v1/chat/batch", json=payload
+        ) as response:
+            async for line in response.aiter_lines():
+                if not line.strip() or response.status_code != 200:
+                    continue
+                arrived = time.perf_counter() - start
+                item = json.loads(line)
+                if item.get("done"):
+                    continue
+                results.append(
+                    {
+                        "latency": item.get("timings", {}).get("total_seconds", 0.0),
+                        "ttfb": arrived,
+                        "ttfa": arrived,
+                        "error": "error" in item,
+                        "rejected": False,
+                    }
+                )
+        elapsed = time.perf_counter() - start
+
+    if response.status_code != 200:
+        raise RuntimeError(f"Batch request failed with {response.status_code}")
+    return _summarize(results, elapsed)
+
+
+def _summarize(results: List[dict], elapsed: float) -> dict:
+    served = [r for r in results if not r["rejected"]]
+    latencies = [r["latency"] for r in served]
+    ttfb = [r["ttfb"] for r in served]
+    ttfa = [r["ttfa"] for r in served if r["ttfa"] is not None]
+    summary = {
+        "requests": len(results),
+        "errors": sum(r["error"] for r in results),
+        "rejected": sum(r["rejected"] for r in results),
+        "seconds": elapsed,
+        "requests_per_second": len(results) / elapsed if elapsed else 0.0,
+        "bytes_per_response": (
+            statistics.fmean(r.get("bytes", 0) for r in served) if served else 0.0
+        ),
+    }
+    for name, values in (("latency", latencies), ("ttfb", ttfb), ("ttfa", ttfa)):
+        for pct in (50, 95, 99):
+            summary[f"{name}_p{pct}_ms"] = _percentile(values, pct) * 1000
+    return summary
+
+
+def node_summary(timer: NodeTimer) -> Dict[str, dict]:
+    return {
+        node: {
+            "calls": len(values),
+            "mean_ms": statistics.fmean(values) * 1000,
+            "p50_ms": _percentile(values, 50) * 1000,
+            "p95_ms": _percentile(values, 95) * 1000,
+        }
+        for node, values in sorted(timer.durations.items())
+    }
+
+
+def print_report(
+    summary: dict, nodes: Dict[str, dict], prompt_cache: Dict[str, dict]
+):
+    print(
+        f"requests={summary['requests']} errors={summary['errors']} "
+        f"rejected={summary['rejected']} "
+        f"rps={summary['requests_per_second']:.1f} "
+        f"wall={summary['seconds']:.2f}s "
+        f"bytes/response={summary['bytes_per_response']:.0f}"
+    )
+    print(f"{'':10} {'p50':>9} {'p95':>9} {'p99':>9}  (ms)")
+    for name in ("latency", "ttfb", "ttfa"):
+        print(
+            f"{name:10} "
+            + " ".join(f"{summary[f'{name}_p{p}_ms']:>9.1f}" for p in (50, 95, 99))
+        )
+    print(f"\n{'node':12} {'calls':>6} {'mean':>9} {'p50':>9} {'p95':>9}  (ms)")
+    for node, s in nodes.items():
+        print(
+            f"{node:12} {s['calls']:>6} {s['mean_ms']:>9.1f} "
+            f"{s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f}"
+        )
+    print(f"\n{'node':12} {'prompt':>9} {'cached':>9} {'hit':>6} {'prefill':>9}  (ms)")
+    for node, s in prompt_cache.items():
+        prefill = (s["mean_prefill_seconds"] or 0.0) * 1000
+        print(
+            f"{node:12} {s['prompt_tokens']:>9} {s['cached_tokens']:>9} "
+            f"{s['hit_rate']:>6.0%} {prefill:>9.1f}"
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    parser.add_argument("--tokens-per-second", type=float, default=300.0)
+    parser.add_argument("--answer-tokens", type=int, default=150)
+    parser.add_argument(
+        "--prefill-tokens-per-second", type=float, default=0.0, help="0 = free"
+    )
+    parser.add_argument(
+        "--prefix-cache-slots", type=int, default=0, help="0 = no prompt cache"
+    )
+    parser.add_argument(
+        "--tool-script", choices=["summary", "article"], default="summary"
+    )
+    parser.add_argument("--article-repeat", type=int, default=20)
+    parser.add_argument("--mcp-latency-ms", type=float, default=50.0)
+    parser.add_argument("--mcp-pool-size", type=int, default=2)
+    parser.add_argument(
+        "--mcp-transport", choices=["stdio", "inprocess"], default="stdio"
+    )
+    parser.add_argument("--small-talk-every", type=int, default=4)
+    parser.add_argument("--max-concurrent", type=int, default=32)
+    parser.add_argument("--max-queue", type=int, default=64)
+    parser.add_argument(
+        "--llm-concurrency", type=int, default=0, help="0 = unlimited"
+    )
+    parser.add_argument(
+        "--slow-fraction", type=float, default=0.0, help="LLM calls that stall"
+    )
+    parser.add_argument("--slow-latency-ms", type=float, default=3000.0)
+    parser.add_argument(
+        "--error-fraction", type=float, default=0.0, help="LLM calls that fail"
+    )
+    parser.add_argument(
+        "--fallback", action="store_true", help="add a healthy second provider"
+    )
+    parser.add_argument("--no-hedge", action="store_true")
+    parser.add_argument("--stream-tokens", action="store_true")
+    parser.add_argument("--protocol", choices=["v1", "v2"], default="v1")
+    parser.add_argument("--ndjson", action="store_true", help="v2 NDJSON framing")
+    parser.add_argument("--tool-cache", action="store_true")
+    parser.add_argument("--answer-cache", action="store_true")
+    parser.add_argument("--coalesce", action="store_true")
+    parser.add_argument("--no-fast-path", action="store_true")
+    parser.add_argument("--speculative-search", action="store_true")
+    parser.add_argument("--no-reduce", action="store_true")
+    parser.add_argument(
+        "--topology", choices=["two_stage", "single_pass"], default="two_stage"
+    )
+    parser.add_argument(
+        "--batch", action="store_true", help="send all questions to /chat/batch"
+    )
+    parser.add_argument("--verbose", action="store_true", help="keep app INFO logs")
+    parser.add_argument("--json", action="store_true", help="print JSON only")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        configure_environment(args, workdir)
+        install_fake_llms(args)
+
+        from src.main import app
+        from src.services.agent_service import agent_service
+
+        if not args.verbose:
+            logging.getLogger("src").setLevel(logging.WARNING)
+            # In-process MCP servers log every request.
+            logging.getLogger("mcp").setLevel(logging.WARNING)
+
+        timer = NodeTimer()
+        agent_service.callbacks.append(timer)
+
+        port = _free_port()
+        config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+        server = uvicorn.Server(config)
+        server_task = asyncio.create_task(server.serve())
+        while not server.started:
+            if server_task.done():
+                raise RuntimeError("Benchmark server failed to start")
+            await asyncio.sleep(0.05)
+
+        try:
+            run = drive_batch if args.batch else drive
+            summary = await run(args, f"http://127.0.0.1:{port}")
+        finally:
+            server.should_exit = True
+            await server_task
+
+    from src.core.metrics import prompt_cache_stats
+
+    nodes = node_summary(timer)
+    prompt_cache = prompt_cache_stats()
+    if args.json:
+        print(
+            json.dumps(
+                {"summary": summary, "nodes": nodes, "prompt_cache": prompt_cache},
+                indent=2,
+            )
+        )
+    else:
+        print_report(summary, nodes, prompt_cache)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
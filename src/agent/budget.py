@@ -0,0 +1,69 @@
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from src.agent.state import AgentState
+from src.core.config import get_settings
+
+DEADLINE = "deadline"
+TOOL_ROUNDS = "tool_rounds"
+
+# Tool rounds allowed when a turn has no round budget of its own, so that a
+# deadline-only loop stops before the graph's recursion limit does.
+MAX_TOOL_ROUNDS_CEILING = 50
+
+
+@dataclass(frozen=True)
+class Budget:
+    """Limits on the research (context <-> tools) loop of one turn."""
+
+    deadline_seconds: Optional[float] = None
+    max_tool_rounds: Optional[int] = None
+
+    @classmethod
+    def for_request(
+        cls,
+        deadline_seconds: Optional[float] = None,
+        max_tool_rounds: Optional[int] = None,
+    ) -> "Budget":
+        """Request values where given, the configured defaults otherwise."""
+        settings = get_settings()
+        if deadline_seconds is None:
+            deadline_seconds = settings.research_deadline_seconds
+        if max_tool_rounds is None:
+            max_tool_rounds = settings.max_tool_rounds
+        return cls(deadline_seconds or None, max_tool_rounds or None)
+
+    def initial_state(self) -> dict:
+        deadline = None
+        if self.deadline_seconds:
+            deadline = time.time() + self.deadline_seconds
+        return {
+            "deadline": deadline,
+            "max_tool_rounds": self.max_tool_rounds,
+            "tool_rounds": 0,
+            "budget_exhausted": None,
+        }
+
+    def recursion_limit(self, default: int = 25) -> int:
+        # Each tool round takes two graph steps (context, tools).
+        rounds = self.max_tool_rounds or MAX_TOOL_ROUNDS_CEILING
+        return max(default, 2 * rounds + 10)
+
+
+def remaining_seconds(state: AgentState) -> Optional[float]:
+    if state.deadline is None:
+        return None
+    return max(state.deadline - time.time(), 0.0)
+
+
+def exhausted_reason(state: AgentState) -> Optional[str]:
+    """Why the research loop must stop now, or None while budget remains."""
+    if state.budget_exhausted:
+        return state.budget_exhausted
+    max_tool_rounds = state.max_tool_rounds or MAX_TOOL_ROUNDS_CEILING
+    if state.tool_rounds >= max_tool_rounds:
+        return TOOL_ROUNDS
+    if state.deadline is not None and time.time() >= state.deadline:
+        return DEADLINE
+    return None
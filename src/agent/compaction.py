@@ -0,0 +1,89 @@
+import json
+from typing import Any, List
+
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage
+
+from src.core.config import get_settings
+
+# Rough characters-per-token ratio; good enough for budgeting.
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(message: Any) -> int:
+    content = getattr(message, "content", "")
+    if not isinstance(content, str):
+        content = json.dumps(content, default=str)
+    chars = len(content)
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        chars += len(json.dumps(tool_calls, default=str))
+    return chars // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+
+
+def split_turns(messages: List[Any]) -> List[List[Any]]:
+    """Group messages into turns, each starting at a HumanMessage."""
+    turns: List[List[Any]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def compact_turn(turn: List[Any]) -> List[Any]:
+    """Reduce a finished turn to the user's message and the final answer."""
+    answer = None
+    for message in reversed(turn):
+        if isinstance(message, AIMessage) and not message.tool_calls:
+            answer = message
+            break
+    return [
+        message
+        for message in turn
+        if message is answer or (message is turn[0] and isinstance(message, HumanMessage))
+    ]
+
+
+def stale_message_removals(messages: List[Any]) -> List[RemoveMessage]:
+    """Removals for tool traffic and scratch messages of earlier turns."""
+    removals = []
+    for turn in split_turns(messages)[:-1]:
+        kept = {id(message) for message in compact_turn(turn)}
+        removals.extend(
+            RemoveMessage(id=message.id)
+            for message in turn
+            if id(message) not in kept and message.id
+        )
+    return removals
+
+
+def fit_to_budget(messages: List[Any], budget: int) -> List[Any]:
+    """Keep the current turn intact and as many recent earlier turns as fit."""
+    turns = split_turns(messages)
+    if not turns:
+        return []
+    current = turns[-1]
+    remaining = budget - sum(estimate_tokens(m) for m in current)
+
+    kept: List[List[Any]] = []
+    for turn in reversed(turns[:-1]):
+        turn = compact_turn(turn)
+        cost = sum(estimate_tokens(m) for m in turn)
+        if cost > remaining:
+            break
+        kept.append(turn)
+        remaining -= cost
+
+    return [m for turn in reversed(kept) for m in turn] + current
+
+
+def messages_for_node(node: str, messages: List[Any]) -> List[Any]:
+    """The slice of the thread a node should send to its model."""
+    settings = get_settings()
+    budget = settings.node_token_budgets.get(node)
+    if not settings.compaction_enabled or budget is None:
+        return list(messages)
+    return fit_to_budget(messages, budget)
+
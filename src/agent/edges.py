@@ -4,13 +4,21 @@ from src.agent.state import AgentState
 
 
 def should_continue(state: AgentState) -> Literal["tools", "synthesize"]:
+    if state.budget_exhausted:
+        return "synthesize"
     messages = state.messages
     last_message = messages[-1]
-    if last_message.tool_calls:
+    if getattr(last_message, "tool_calls", None):
         return "tools"
     return "synthesize"
 
 
+def triage_decision(state: AgentState) -> Literal["tools", "synthesize", "end"]:
+    if state.next_step == "reply":
+        return "end"
+    return should_continue(state)
+
+
 def route_decision(state: AgentState) -> Literal["context", "reply"]:
     if state.next_step == "context":
         return "context"
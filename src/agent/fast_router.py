@@ -0,0 +1,121 @@
+import re
+import logging
+from dataclasses import dataclass
+from typing import Literal, Optional
+
+from src.core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+Step = Literal["context", "reply"]
+
+
+@dataclass(frozen=True)
+class FastRoute:
+    step: Optional[Step]
+    confidence: float
+    source: str
+
+
+_SMALL_TALK = re.compile(
+    r"^(hi|hello|hey|hiya|yo|howdy|greetings|good (morning|afternoon|evening|night)"
+    r"|thanks?( you)?( (so|very) much)?|thank you|thx|ty|cheers|ok(ay)?|cool|great"
+    r"|nice|awesome|perfect|got it|bye|goodbye|see you( later)?|lol|haha)"
+    r"( there| bot| again)?$"
+)
+_ABOUT_BOT = re.compile(
+    r"^(who are you|what are you|what is your name|what's your name"
+    r"|how are you( doing)?|what can you do|are you (a bot|an ai|human))$"
+)
+_CREATIVE = re.compile(
+    r"^(please )?(write|compose|make up|tell me|give me) (me )?(a|an|another|some) "
+    r"(short |funny |little )?(poem|story|joke|haiku|limerick|song|riddle|pun)s?\b"
+)
+_FACTUAL = re.compile(
+    r"^(who|what|when|where|which|whose)('s| (is|was|are|were|did|does|do|has|had))\b"
+    r"|^how (many|much|old|tall|long|far|big|did|does|was|were)\b"
+    r"|^(tell me about|what about|history of|explain|define|describe) \w"
+)
+_ABOUT_YOU = re.compile(r"\b(you|your|yours|yourself)\b")
+# Follow-ups whose meaning depends on the previous turns.
+_ANAPHORA = re.compile(r"\b(it|he|she|they|them|him|her|his|its|that|this|those|more)\b")
+
+
+def normalize_message(text: str) -> str:
+    text = text.casefold().strip()
+    text = re.sub(r"[^\w\s']", " ", text)
+    return " ".join(text.split())
+
+
+class FastRouter:
+    """Local pre-classifier that answers routing decisions without an LLM.
+
+    Decisions come from hand-written rules or from a memo of earlier LLM
+    decisions keyed by the normalized message. Anything below ``threshold``
+    falls back to the LLM router.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        memo_size: int = 10000,
+        memo_ttl_seconds: Optional[float] = 24 * 3600,
+        memo_confidence: float = 0.9,
+    ):
+        self.threshold = threshold
+        self.memo_confidence = memo_confidence
+        self._memo = TTLCache(maxsize=memo_size, ttl=memo_ttl_seconds)
+        self.decisions = {"rules": 0, "memo": 0, "llm": 0}
+        # Agreement between low-confidence local guesses and the LLM, by
+        # confidence bucket, to help tune the threshold.
+        self.shadow: dict[str, dict[str, int]] = {}
+
+    def _rules(self, text: str) -> FastRoute:
+        if not text:
+            return FastRoute(None, 0.0, "rules")
+        if _SMALL_TALK.match(text) or _ABOUT_BOT.match(text):
+            return FastRoute("reply", 0.97, "rules")
+        if _CREATIVE.match(text):
+            return FastRoute("reply", 0.9, "rules")
+        if _FACTUAL.match(text):
+            if _ABOUT_YOU.search(text):
+                return FastRoute("reply", 0.5, "rules")
+            return FastRoute("context", 0.9, "rules")
+        return FastRoute(None, 0.0, "rules")
+
+    def classify(self, message: str) -> FastRoute:
+        text = normalize_message(message)
+        route = self._rules(text)
+        if route.confidence < self.threshold and not _ANAPHORA.search(text):
+            memo_step = self._memo.get(text)
+            if memo_step is not None:
+                route = FastRoute(memo_step, self.memo_confidence, "memo")
+        return route
+
+    def is_confident(self, route: FastRoute) -> bool:
+        return route.step is not None and route.confidence >= self.threshold
+
+    def record_fast_path(self, route: FastRoute):
+        self.decisions[route.source] += 1
+
+    def record_llm_decision(self, message: str, guess: FastRoute, step: Step):
+        self.decisions["llm"] += 1
+        text = normalize_message(message)
+        if text and not _ANAPHORA.search(text):
+            self._memo.set(text, step)
+        if guess.step is not None:
+            bucket = f"{int(guess.confidence * 10) / 10:.1f}"
+            counts = self.shadow.setdefault(bucket, {"agree": 0, "disagree": 0})
+            counts["agree" if guess.step == step else "disagree"] += 1
+
+    def stats(self) -> dict:
+        total = sum(self.decisions.values())
+        fast = self.decisions["rules"] + self.decisions["memo"]
+        return {
+            "threshold": self.threshold,
+            "decisions": dict(self.decisions),
+            "fast_path_hit_rate": round(fast / total, 4) if total else 0.0,
+            "memo_size": len(self._memo),
+            "shadow_agreement": self.shadow,
+        }
@@ -1,7 +1,6 @@
-from typing import List
+from typing import List, Optional
 from langchain_core.tools import StructuredTool
 from langgraph.graph import StateGraph, START, END
-from langgraph.prebuilt import ToolNode
 from langgraph.checkpoint.base import BaseCheckpointSaver
 
 from src.agent.state import AgentState
@@ -9,41 +8,92 @@ from src.agent.nodes.router import RouterNode
 from src.agent.nodes.context import ContextNode
 from src.agent.nodes.synthesize import SynthesizeNode
 from src.agent.nodes.reply import ReplyNode
-from src.agent.edges import should_continue, route_decision
+from src.agent.nodes.compact import CompactNode
+from src.agent.nodes.reduce import ReduceNode
+from src.agent.nodes.single_pass import SinglePassNode
+from src.agent.nodes.tools import ToolsNode
+from src.agent.edges import should_continue, route_decision, triage_decision
+from src.agent.fast_router import FastRouter
+from src.agent.speculation import SpeculativeSearch
+from src.agent.instrumentation import instrument_node
+from src.core.config import get_settings
 
+# Graph layouts: "two_stage" routes with its own LLM call before researching
+# or replying; "single_pass" lets the first tool-bound research call do both.
+TOPOLOGIES = ("two_stage", "single_pass")
+# Node that writes the answer of a turn that needed no research.
+REPLY_NODES = {"two_stage": "reply", "single_pass": "triage"}
+
+
+def create_graph(
+    tools: List[StructuredTool],
+    checkpointer: BaseCheckpointSaver,
+    fast_router: Optional[FastRouter] = None,
+    speculative_search: Optional[SpeculativeSearch] = None,
+    topology: Optional[str] = None,
+):
+    settings = get_settings()
+    topology = topology or settings.graph_topology
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown graph topology: {topology}")
 
-def create_graph(tools: List[StructuredTool], checkpointer: BaseCheckpointSaver):
     # Initialize Nodes
-    router_node = RouterNode()
     context_node = ContextNode(tools)
     synthesize_node = SynthesizeNode()
-    reply_node = ReplyNode()
-    tool_node = ToolNode(tools)
+    tool_node = ToolsNode(tools)
 
     # Build Graph
     workflow = StateGraph(AgentState)
 
-    workflow.add_node("router", router_node)
-    workflow.add_node("context", context_node)
-    workflow.add_node("synthesize", synthesize_node)
-    workflow.add_node("reply", reply_node)
-    workflow.add_node("tools", tool_node)
-
-    # Edges
-    workflow.add_edge(START, "router")
-
-    workflow.add_conditional_edges(
-        "router", route_decision, {"context": "context", "reply": "reply"}
-    )
+    workflow.add_node("context", instrument_node("context", context_node))
+    workflow.add_node("synthesize", instrument_node("synthesize", synthesize_node))
+    workflow.add_node("tools", instrument_node("tools", tool_node))
 
-    # Context loop
+    # Context loop; its output is reduced to the relevant passages first
+    research_done = "synthesize"
+    if settings.passage_reduction_enabled:
+        reduce_node = ReduceNode(
+            settings.passage_budget_tokens, settings.passage_max_chars
+        )
+        workflow.add_node("reduce", instrument_node("reduce", reduce_node))
+        workflow.add_edge("reduce", "synthesize")
+        research_done = "reduce"
     workflow.add_conditional_edges(
-        "context", should_continue, {"tools": "tools", "synthesize": "synthesize"}
+        "context", should_continue, {"tools": "tools", "synthesize": research_done}
     )
     workflow.add_edge("tools", "context")
 
+    # Entry: the router, or the single-pass triage call
+    if topology == "single_pass":
+        # The fast path and speculative search hook into the router, which
+        # this layout does not have.
+        entry = "triage"
+        workflow.add_node("triage", instrument_node("triage", SinglePassNode(tools)))
+        workflow.add_conditional_edges(
+            "triage",
+            triage_decision,
+            {"tools": "tools", "synthesize": research_done, "end": END},
+        )
+    else:
+        entry = "router"
+        router_node = RouterNode(
+            fast_router=fast_router, speculative_search=speculative_search
+        )
+        workflow.add_node("router", instrument_node("router", router_node))
+        workflow.add_node("reply", instrument_node("reply", ReplyNode()))
+        workflow.add_conditional_edges(
+            "router", route_decision, {"context": "context", "reply": "reply"}
+        )
+        workflow.add_edge("reply", END)
+
+    if settings.compaction_enabled:
+        workflow.add_node("compact", instrument_node("compact", CompactNode()))
+        workflow.add_edge(START, "compact")
+        workflow.add_edge("compact", entry)
+    else:
+        workflow.add_edge(START, entry)
+
     # End states
     workflow.add_edge("synthesize", END)
-    workflow.add_edge("reply", END)
 
     return workflow.compile(checkpointer=checkpointer)
@@ -0,0 +1,104 @@
+import time
+import asyncio
+import inspect
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from src.core.metrics import record_llm_usage, record_node
+
+
+def instrument_node(name: str, node: Any):
+    """Wrap a graph node so every run records its wall time and errors."""
+    if isinstance(node, Runnable):
+
+        async def _invoke(state, config):
+            return await node.ainvoke(state, config)
+
+    elif inspect.iscoroutinefunction(node) or inspect.iscoroutinefunction(
+        getattr(node, "__call__", None)
+    ):
+
+        async def _invoke(state, config):
+            return await node(state)
+
+    else:
+        # Sync nodes (compaction, passage ranking) would block the event loop
+        # and with it every other stream.
+        async def _invoke(state, config):
+            return await asyncio.to_thread(node, state)
+
+    async def _run(state, config: RunnableConfig):
+        start = time.perf_counter()
+        error = False
+        try:
+            return await _invoke(state, config)
+        except Exception:
+            error = True
+            raise
+        finally:
+            record_node(name, time.perf_counter() - start, error)
+
+    return _run
+
+
+def _prompt_usage(usage: dict) -> Tuple[int, int]:
+    """Prompt tokens and how many of them came from the provider's cache.
+
+    Ollama reports only the tokens it evaluated, not the prompt size, so its
+    KV cache reuse is not counted; its prefill time still shows the effect.
+    """
+    prompt_tokens = usage.get("input_tokens", 0)
+    cached = (usage.get("input_token_details") or {}).get("cache_read") or 0
+    return prompt_tokens, cached
+
+
+def _prefill_seconds(metadata: dict) -> Optional[float]:
+    if metadata.get("prompt_eval_duration") is not None:
+        return metadata["prompt_eval_duration"] / 1e9  # Ollama, nanoseconds
+    prompt_time = (metadata.get("token_usage") or {}).get("prompt_time")
+    return float(prompt_time) if prompt_time is not None else None  # Groq
+
+
+class LLMUsageCallbackHandler(BaseCallbackHandler):
+    """Records tokens, prompt cache hits and prefill time of each chat model call."""
+
+    run_inline = True
+
+    def __init__(self):
+        # run_id -> node
+        self._runs: Dict[UUID, str] = {}
+
+    def on_chat_model_start(
+        self, serialized, messages, *, run_id: UUID, metadata=None, **kwargs
+    ):
+        self._runs[run_id] = (metadata or {}).get("langgraph_node", "unknown")
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs):
+        node = self._runs.pop(run_id, None)
+        if node is None:
+            return
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None)
+                if not usage:
+                    continue
+                metadata = {
+                    **(generation.generation_info or {}),
+                    **(getattr(message, "response_metadata", None) or {}),
+                }
+                prompt_tokens, cached = _prompt_usage(usage)
+                record_llm_usage(
+                    node,
+                    prompt_tokens,
+                    usage.get("output_tokens", 0),
+                    cached_tokens=cached,
+                    prefill_seconds=_prefill_seconds(metadata),
+                )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        self._runs.pop(run_id, None)
@@ -0,0 +1,12 @@
+from src.agent.state import AgentState
+from src.agent.compaction import stale_message_removals
+
+
+class CompactNode:
+    """Drops earlier turns' tool calls and tool outputs from the thread."""
+
+    def __call__(self, state: AgentState):
+        removals = stale_message_removals(state.messages)
+        if not removals:
+            return {}
+        return {"messages": removals}
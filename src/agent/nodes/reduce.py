@@ -0,0 +1,105 @@
+import json
+import logging
+from typing import Any, List, Optional
+
+from langchain_core.messages import HumanMessage, ToolMessage
+
+from src.agent.state import AgentState
+from src.agent.compaction import estimate_tokens, split_turns
+from src.agent.passages import (
+    estimate_text_tokens,
+    render_passages,
+    score_passages,
+    select_passages,
+    split_passages,
+)
+from src.core.metrics import record_reduction
+
+logger = logging.getLogger(__name__)
+
+# Bulky list fields of get_article results that the answer never quotes.
+DROPPED_FIELDS = ("sections", "links", "categories")
+
+
+def _content_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "\n".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in content
+        )
+    return str(content)
+
+
+def _json_object(text: str) -> Optional[dict]:
+    if not text.startswith("{"):
+        return None
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+class ReduceNode:
+    """Cuts this turn's long tool outputs down to the passages that matter.
+
+    Article text is split into section-tagged passages, ranked against the
+    user's question with BM25 and kept up to ``budget_tokens``. Titles, URLs
+    and other scalar fields stay, and the messages keep their ids, tool call
+    ids and artifacts, so references and snapshots still work.
+    """
+
+    def __init__(self, budget_tokens: int, max_passage_chars: int):
+        self.budget_tokens = budget_tokens
+        self.max_passage_chars = max_passage_chars
+
+    def __call__(self, state: AgentState):
+        turn = split_turns(state.messages)[-1]
+        tool_messages = [m for m in turn if isinstance(m, ToolMessage)]
+        before = sum(estimate_tokens(m) for m in tool_messages)
+        if before <= self.budget_tokens:
+            return {}
+        question = turn[0].content if isinstance(turn[0], HumanMessage) else ""
+
+        # Long article text is reduced; everything else is kept as is.
+        docs = []
+        fixed = 0
+        for message in tool_messages:
+            text = _content_text(message.content)
+            data = _json_object(text)
+            body = data.get("text") if data else text
+            if not isinstance(body, str) or len(body) <= self.max_passage_chars:
+                fixed += estimate_tokens(message)
+                continue
+            header = {k: v for k, v in (data or {}).items() if k != "text"}
+            for field in DROPPED_FIELDS:
+                header.pop(field, None)
+            fixed += estimate_text_tokens(json.dumps(header, ensure_ascii=False))
+            passages = split_passages(body, len(docs), self.max_passage_chars)
+            docs.append((message, data is not None, header, passages))
+        if not docs:
+            return {}
+
+        passages = [p for _, _, _, doc_passages in docs for p in doc_passages]
+        score_passages(passages, _content_text(question))
+        kept = select_passages(passages, max(self.budget_tokens - fixed, 0))
+
+        updated: List[ToolMessage] = []
+        for index, (message, structured, header, doc_passages) in enumerate(docs):
+            doc_kept = [p for p in kept if p.doc == index]
+            text = render_passages(doc_kept, len(doc_passages) - len(doc_kept))
+            if structured:
+                content = json.dumps({**header, "text": text}, ensure_ascii=False)
+            else:
+                content = text
+            updated.append(message.model_copy(update={"content": content}))
+
+        after = fixed + sum(p.tokens for p in kept)
+        record_reduction(before, after)
+        logger.info(
+            f"Reduced tool output from ~{before} to ~{after} tokens "
+            f"({len(kept)} of {len(passages)} passages)"
+        )
+        return {"messages": updated}
@@ -1,10 +1,16 @@
-from datetime import datetime
-from typing import Literal
+import logging
+from typing import Literal, Optional
 from langchain_core.messages import SystemMessage, HumanMessage
 from pydantic import BaseModel, Field
 from src.agent.state import AgentState
 from src.agent.prompts.route_prompt import get_route_prompt
-from src.core.config import get_settings
+from src.agent.prompts.common import prompt_date
+from src.agent.fast_router import FastRouter
+from src.agent.speculation import SpeculativeSearch
+from src.agent.compaction import messages_for_node
+from src.core.llm_router import routed_llm
+
+logger = logging.getLogger(__name__)
 
 
 class RouteResponse(BaseModel):
@@ -13,36 +19,73 @@ class RouteResponse(BaseModel):
     )
 
 
-def _get_router_llm():
-    """Use a separate model for routing that's better at following instructions."""
-    settings = get_settings()
-    if settings.use_groq:
-        from langchain_groq import ChatGroq
+def _last_user_text(state: AgentState) -> str:
+    for message in reversed(state.messages):
+        if isinstance(message, HumanMessage):
+            content = message.content
+            return content if isinstance(content, str) else ""
+    return ""
 
-        # Use llama for routing - it follows structured output better than qwen3
-        return ChatGroq(
-            model=settings.groq_router_model,
-            api_key=settings.groq_api_key,
-            temperature=0,
-        )
-    else:
-        from langchain_ollama import ChatOllama
 
-        return ChatOllama(
-            model=settings.ollama_model,
-            base_url=settings.ollama_base_url,
-            temperature=0,
+class RouterNode:
+    def __init__(
+        self,
+        model_name: str = None,
+        fast_router: Optional[FastRouter] = None,
+        speculative_search: Optional[SpeculativeSearch] = None,
+    ):
+        self.structured_llm = routed_llm(
+            "router", lambda llm: llm.with_structured_output(RouteResponse)
         )
+        self.fast_router = fast_router
+        self.speculative_search = speculative_search
 
+    async def __call__(self, state: AgentState):
+        user_text = _last_user_text(state)
+        guess = None
+        if self.fast_router:
+            guess = self.fast_router.classify(user_text)
 
-class RouterNode:
-    def __init__(self, model_name: str = None):
-        self.llm = _get_router_llm()
-        self.structured_llm = self.llm.with_structured_output(RouteResponse)
-
-    def __call__(self, state: AgentState):
-        current_datetime = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        SYSTEM_PROMPT = SystemMessage(content=get_route_prompt(current_datetime))
-        messages = [SYSTEM_PROMPT] + state.messages
-        response = self.structured_llm.invoke(messages)
-        return {"next_step": response.step, "referenced_article_urls": []}
+        speculation = None
+        confident = guess is not None and self.fast_router.is_confident(guess)
+        if self.speculative_search and user_text.strip():
+            if not (confident and guess.step == "reply"):
+                speculation = self.speculative_search.start(user_text)
+
+        try:
+            step = await self._route(state, user_text, guess, confident)
+        except BaseException:
+            if speculation is not None:
+                self.speculative_search.cancel(speculation)
+            raise
+
+        update = {"next_step": step, "referenced_article_urls": []}
+        if speculation is not None:
+            if step == "context":
+                prefetched = await self.speculative_search.collect(speculation)
+                if prefetched:
+                    update["messages"] = prefetched
+            else:
+                self.speculative_search.cancel(speculation)
+        return update
+
+    async def _route(self, state: AgentState, user_text: str, guess, confident: bool):
+        if confident:
+            self.fast_router.record_fast_path(guess)
+            logger.info(
+                f"Router fast path ({guess.source}): {guess.step} "
+                f"(confidence {guess.confidence:.2f})"
+            )
+            return guess.step
+
+        SYSTEM_PROMPT = SystemMessage(content=get_route_prompt(prompt_date()))
+        messages = [SYSTEM_PROMPT] + messages_for_node("router", state.messages)
+        response = await self.structured_llm.ainvoke(messages)
+
+        if self.fast_router:
+            self.fast_router.record_llm_decision(user_text, guess, response.step)
+            logger.info(
+                f"Router LLM decision: {response.step} "
+                f"(fast path guess {guess.step} at {guess.confidence:.2f})"
+            )
+        return response.step
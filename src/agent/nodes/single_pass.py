@@ -0,0 +1,36 @@
+import logging
+from src.agent.state import AgentState
+from src.agent.prompts.single_pass_prompt import get_single_pass_prompt
+from src.agent.nodes.context import ContextNode
+
+logger = logging.getLogger(__name__)
+
+
+class SinglePassNode(ContextNode):
+    """Routes a turn and starts its research in one tool-bound model call.
+
+    Tool calls send the turn into the research loop; a direct answer is the
+    reply, so the turn needs no separate router call.
+    """
+
+    name = "triage"
+
+    def prompt(self, current_date: str) -> str:
+        return get_single_pass_prompt(current_date)
+
+    async def __call__(self, state: AgentState):
+        update = await super().__call__(state)
+        response = (update.get("messages") or [None])[-1]
+        if response is None or response.tool_calls:
+            update["next_step"] = "context"
+        elif _text(response.content) == "Done.":
+            # Researcher habit without any research: let synthesize answer.
+            update["next_step"] = "context"
+        else:
+            update["next_step"] = "reply"
+        logger.info(f"SinglePassNode decision: {update['next_step']}")
+        return update
+
+
+def _text(content) -> str:
+    return content.strip() if isinstance(content, str) else ""
@@ -1,38 +1,17 @@
-from datetime import datetime
 from langchain_core.messages import SystemMessage
 from src.agent.state import AgentState
 from src.agent.prompts.synthesize_prompt import get_synthesize_prompt
-from src.core.config import get_settings
-
-
-def _get_llm():
-    settings = get_settings()
-    if settings.use_groq:
-        from langchain_groq import ChatGroq
-
-        return ChatGroq(
-            model=settings.groq_model,
-            api_key=settings.groq_api_key,
-            reasoning_format="hidden",
-            temperature=0,
-        )
-    else:
-        from langchain_ollama import ChatOllama
-
-        return ChatOllama(
-            model=settings.ollama_model,
-            base_url=settings.ollama_base_url,
-            temperature=0,
-        )
+from src.agent.prompts.common import prompt_date
+from src.agent.compaction import messages_for_node
+from src.core.llm_router import routed_llm
 
 
 class SynthesizeNode:
     def __init__(self, model_name: str = None):
-        self.llm = _get_llm()
+        self.llm = routed_llm("synthesize")
 
-    def __call__(self, state: AgentState):
-        current_datetime = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        SYS = SystemMessage(content=get_synthesize_prompt(current_datetime))
-        messages = [SYS] + state.messages
-        response = self.llm.invoke(messages)
+    async def __call__(self, state: AgentState):
+        SYS = SystemMessage(content=get_synthesize_prompt(prompt_date()))
+        messages = [SYS] + messages_for_node("synthesize", state.messages)
+        response = await self.llm.ainvoke(messages)
         return {"messages": [response]}
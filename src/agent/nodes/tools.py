@@ -0,0 +1,11 @@
+from langgraph.prebuilt import ToolNode
+
+from src.mcp.mcp_client_utils import tool_deadline
+
+
+class ToolsNode(ToolNode):
+    """Runs the requested tool calls, none past the turn's research deadline."""
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        with tool_deadline(getattr(input, "deadline", None)):
+            return await super().ainvoke(input, config, **kwargs)
@@ -0,0 +1,163 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from src.agent.compaction import CHARS_PER_TOKEN
+
+_WORD = re.compile(r"\w+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "did", "do", "does", "for",
+    "from", "how", "in", "is", "it", "its", "of", "on", "or", "that", "the",
+    "this", "to", "was", "were", "what", "when", "where", "which", "who",
+    "whom", "why", "with",
+}
+# "== History ==" style headings as found in Wikipedia plain text.
+_HEADING = re.compile(r"^\s*(=+)\s*(.+?)\s*\1\s*$")
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        word
+        for word in (w.casefold() for w in _WORD.findall(text))
+        if word not in _STOPWORDS
+    ]
+
+
+def estimate_text_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+@dataclass
+class Passage:
+    doc: int
+    position: int
+    section: Optional[str]
+    text: str
+    score: float = 0.0
+
+    @property
+    def tokens(self) -> int:
+        return estimate_text_tokens(self.text)
+
+
+def _bare_title(line: str) -> Optional[str]:
+    # A short line without closing punctuation or digits; "Population
+    # 2,165,423" style infobox lines are content.
+    line = line.strip()
+    if (
+        line
+        and len(line) <= 60
+        and line[-1] not in ".!?:;,)\"'"
+        and not any(c.isdigit() for c in line)
+    ):
+        return line
+    return None
+
+
+def _is_title(line: str) -> bool:
+    return bool(_HEADING.match(line)) or _bare_title(line) is not None
+
+
+def split_passages(text: str, doc: int, max_chars: int) -> List[Passage]:
+    """Split article text into paragraph passages tagged with their section.
+
+    Paragraphs longer than ``max_chars`` are cut at sentence boundaries;
+    short neighbouring paragraphs of one section are merged. ``== X ==``
+    headings start a section; a bare title line does so only when prose
+    follows it, and stays in the passage text.
+    """
+    passages: List[Passage] = []
+    section: Optional[str] = None
+    buffer = ""
+
+    def flush():
+        nonlocal buffer
+        if buffer.strip():
+            passages.append(Passage(doc, len(passages), section, buffer.strip()))
+        buffer = ""
+
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    for i, paragraph in enumerate(paragraphs):
+        # A section title may be the first line of its section's paragraph.
+        first, _, rest = paragraph.partition("\n")
+        match = _HEADING.match(first)
+        if match:
+            flush()
+            section = match.group(2)
+            paragraph = rest
+        elif _bare_title(first) is not None:
+            following = rest.strip()
+            if not following and i + 1 < len(paragraphs):
+                following = paragraphs[i + 1]
+            if following and not _is_title(following.partition("\n")[0]):
+                flush()
+                section = first.strip()
+        if not paragraph.strip():
+            continue
+        for sentence in re.split(r"(?<=[.!?])\s+", paragraph.strip()):
+            if buffer and len(buffer) + len(sentence) + 1 > max_chars:
+                flush()
+            buffer = f"{buffer} {sentence}" if buffer else sentence
+        if len(buffer) >= max_chars // 2:
+            flush()
+        else:
+            buffer += "\n"
+    flush()
+    return passages
+
+
+def score_passages(passages: Sequence[Passage], query: str):
+    """Set each passage's BM25 score against ``query`` (the passages are the corpus)."""
+    terms = set(tokenize(query))
+    if not passages or not terms:
+        return
+    docs = [Counter(tokenize(p.text)) for p in passages]
+    avg_len = sum(sum(d.values()) for d in docs) / len(docs) or 1.0
+    df: Dict[str, int] = {t: sum(1 for d in docs if t in d) for t in terms}
+    n = len(docs)
+    for passage, counts in zip(passages, docs):
+        length = sum(counts.values())
+        score = 0.0
+        for term in terms:
+            tf = counts.get(term, 0)
+            if not tf:
+                continue
+            idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len)
+            score += idf * tf * (BM25_K1 + 1) / norm
+        passage.score = score
+
+
+def select_passages(passages: Sequence[Passage], budget_tokens: int) -> List[Passage]:
+    """Best-scoring passages that fit the budget, in document order.
+
+    The lead passage of each document is ranked first: article intros carry
+    the definition most answers start from.
+    """
+    ranked = sorted(
+        passages, key=lambda p: (p.position != 0, -p.score, p.doc, p.position)
+    )
+    kept, used = [], 0
+    for passage in ranked:
+        if used + passage.tokens > budget_tokens:
+            continue
+        kept.append(passage)
+        used += passage.tokens
+    return sorted(kept, key=lambda p: (p.doc, p.position))
+
+
+def render_passages(passages: Sequence[Passage], omitted: int) -> str:
+    parts, section = [], None
+    for passage in passages:
+        if passage.section and passage.section != section:
+            parts.append(f"== {passage.section} ==")
+        section = passage.section
+        parts.append(passage.text)
+    if omitted:
+        parts.append(f"[{omitted} less relevant passages omitted]")
+    return "\n\n".join(parts)
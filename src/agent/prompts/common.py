@@ -0,0 +1,11 @@
+from datetime import date
+
+
+def prompt_date() -> str:
+    """Today's date, the only volatile part of the system prompts.
+
+    It goes at the end of each prompt and changes once a day, so the prompt
+    prefix stays byte-identical and provider prompt caches and Ollama's KV
+    cache can reuse it across requests and turns.
+    """
+    return date.today().isoformat()
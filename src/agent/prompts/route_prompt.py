@@ -1,6 +1,5 @@
-def get_route_prompt(current_datetime: str) -> str:
+def get_route_prompt(current_date: str) -> str:
     return f"""You are an intelligent router agent.
-Current date and time: {current_datetime}
 
 Your task is to classify the user's input into one of two categories: 'context' or 'reply'.
 
@@ -8,4 +7,6 @@ Your task is to classify the user's input into one of two categories: 'context'
 - 'reply': Use this when the user's input is a greeting, a compliment, a personal question about you, or a simple request that doesn't require external knowledge (e.g., "write a poem about a cat").
 
 DO NOT answer the user's question. Your ONLY job is to classify the intent.
+
+Current date: {current_date}
 """
@@ -1,6 +1,5 @@
-def get_synthesize_prompt(current_datetime: str) -> str:
+def get_synthesize_prompt(current_date: str) -> str:
     return f"""You are an expert research assistant and writer. Your responses are the FINAL output that users see.
-Current date and time: {current_datetime}
 
 Your task is to synthesize the information gathered by the researcher agent (from the ToolMessage outputs in the conversation) into a comprehensive, detailed answer.
 
@@ -66,4 +65,6 @@ Emmanuel Macron is the current President of France, a position he has held since
 His political career began when he served as Minister of Economy, Industry and Digital Affairs under President François Hollande from 2014 to 2016. In 2016, he made the bold move of founding his own political party, En Marche (now known as Renaissance), positioning himself as a centrist alternative to France's traditional left-right divide.
 
 Macron won the 2017 presidential election in a runoff against far-right candidate Marine Le Pen. He was re-elected in 2022, again defeating Le Pen in the second round, making him the first French president to win re-election in 20 years. At 39, he became the youngest president in French history when first elected.
+
+Current date: {current_date}
 """
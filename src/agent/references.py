@@ -0,0 +1,133 @@
+import re
+from typing import Any, Iterable, List, Optional
+from urllib.parse import quote, unquote, urlsplit
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.messages.base import BaseMessage
+
+# Tools whose result (and ``title`` argument) is about a single article;
+# search results are candidates, not references.
+ARTICLE_TOOLS = {
+    "get_summary",
+    "get_article",
+    "extract_key_facts",
+    "summarize_article_for_query",
+    "summarize_article_section",
+}
+
+# Upper bound on the text scanned for URLs per message, so extraction cost
+# does not grow with the size of an article body.
+MAX_SCAN_CHARS = 4096
+
+WIKIPEDIA_URL_PATTERN = re.compile(
+    r"https?://[a-z\-]+(?:\.m)?\.wikipedia\.org/wiki/[^\s\"'<>)\]]+", re.IGNORECASE
+)
+_TITLE_SAFE = "()_,'!:~.-/"
+
+
+def _canonical_title(title: str) -> str:
+    title = "_".join(title.replace("_", " ").split())
+    return title[:1].upper() + title[1:]
+
+
+def article_url(title: str, lang: str = "en") -> str:
+    path = quote(_canonical_title(title), safe=_TITLE_SAFE)
+    return f"https://{lang}.wikipedia.org/wiki/{path}"
+
+
+def normalize_url(url: str) -> Optional[str]:
+    """Canonical form of a Wikipedia article URL, or None if it is not one."""
+    parts = urlsplit(url.strip().rstrip(".,;\"'"))
+    host = parts.netloc.lower().removesuffix(":443")
+    if not host.endswith(".wikipedia.org") or not parts.path.startswith("/wiki/"):
+        return None
+    lang = host.split(".", 1)[0]
+    title = unquote(parts.path[len("/wiki/") :])
+    if not title:
+        return None
+    return article_url(title, lang)
+
+
+def _scan_text(text: str) -> List[str]:
+    return WIKIPEDIA_URL_PATTERN.findall(text[:MAX_SCAN_CHARS])
+
+
+def _text_of(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        # Only the leading parts are scanned; stop once the budget is spent.
+        parts, size = [], 0
+        for part in content:
+            if isinstance(part, dict):
+                part = part.get("text", "")
+            text = part if isinstance(part, str) else ""
+            parts.append(text)
+            size += len(text)
+            if size >= MAX_SCAN_CHARS:
+                break
+        return "\n".join(parts)
+    return ""
+
+
+def _tool_call_urls(message: AIMessage) -> List[str]:
+    urls = []
+    for tool_call in message.tool_calls:
+        title = tool_call.get("args", {}).get("title")
+        if tool_call.get("name") in ARTICLE_TOOLS and isinstance(title, str) and title:
+            urls.append(article_url(title))
+    return urls
+
+
+def _tool_result_urls(message: ToolMessage) -> List[str]:
+    if message.name not in ARTICLE_TOOLS:
+        return []
+    artifact = message.artifact
+    if isinstance(artifact, dict):
+        if artifact.get("exists") is False or artifact.get("error"):
+            return []
+        if isinstance(artifact.get("url"), str):
+            return [artifact["url"]]
+        if isinstance(artifact.get("title"), str):
+            return [article_url(artifact["title"])]
+        return []
+    # Servers without structured output: bounded scan of the text result.
+    return _scan_text(_text_of(message.content))
+
+
+def extract_references(messages: Iterable[BaseMessage]) -> List[str]:
+    """Canonical, de-duplicated Wikipedia URLs referenced by ``messages``.
+
+    Tool results are read from their structured artifact (``url``/``title``);
+    model messages contribute the titles they request and URLs quoted in the
+    first ``MAX_SCAN_CHARS`` of their text.
+    """
+    candidates: List[str] = []
+    for message in messages:
+        if isinstance(message, ToolMessage):
+            candidates.extend(_tool_result_urls(message))
+        elif isinstance(message, AIMessage):
+            candidates.extend(_scan_text(_text_of(message.content)))
+            candidates.extend(_tool_call_urls(message))
+
+    return merge_references([], (normalize_url(c) for c in candidates))
+
+
+def merge_references(existing: List[str], new: Iterable[Optional[str]]) -> List[str]:
+    """Append ``new`` URLs to ``existing``, skipping case-insensitive duplicates."""
+    merged = {url.casefold(): url for url in existing}
+    for url in new:
+        if url:
+            merged.setdefault(url.casefold(), url)
+    return list(merged.values())
+
+
+def latest_tool_results(messages: List[BaseMessage]) -> List[ToolMessage]:
+    """The ToolMessages appended since the last model message."""
+    results = []
+    for message in reversed(messages):
+        if not isinstance(message, ToolMessage):
+            break
+        results.append(message)
+    results.reverse()
+    return results
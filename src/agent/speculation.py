@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from typing import List, Optional
+from uuid import uuid4
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.messages.base import BaseMessage
+from langchain_core.tools import BaseTool
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TOOL = "search_wikipedia"
+MAX_QUERY_CHARS = 300
+
+
+class SpeculativeSearch:
+    """Runs ``search_wikipedia`` on the user message while the router decides.
+
+    When the turn is routed to ``context`` the search is handed over as an
+    already answered tool call; when it is routed to ``reply`` it is cancelled.
+    """
+
+    def __init__(self, tool: BaseTool):
+        self.tool = tool
+        self.started = 0
+        self.hits = 0
+        self.wasted = 0
+        self.failed = 0
+
+    def start(self, message: str) -> asyncio.Task:
+        query = " ".join(message.split())[:MAX_QUERY_CHARS]
+        tool_call = {
+            "name": self.tool.name,
+            "args": {"query": query},
+            "id": f"speculative_{uuid4().hex[:12]}",
+            "type": "tool_call",
+        }
+        self.started += 1
+        task = asyncio.create_task(self._run(tool_call))
+        # Failures of searches that end up cancelled are not worth a warning.
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    async def _run(self, tool_call: dict) -> List[BaseMessage]:
+        # The tool wrapper applies the per-call timeout.
+        result = await self.tool.ainvoke(tool_call)
+        if not isinstance(result, ToolMessage) or result.status == "error":
+            raise RuntimeError(f"Speculative search failed: {result}")
+        return [AIMessage(content="", tool_calls=[tool_call]), result]
+
+    async def collect(self, task: asyncio.Task) -> Optional[List[BaseMessage]]:
+        """The tool call and its result, or None if the search failed."""
+        try:
+            messages = await task
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f"Speculative search discarded: {e}")
+            return None
+        self.hits += 1
+        return messages
+
+    def cancel(self, task: asyncio.Task):
+        self.wasted += 1
+        task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "started": self.started,
+            "hits": self.hits,
+            "wasted": self.wasted,
+            "failed": self.failed,
+            "hit_rate": round(self.hits / self.started, 4) if self.started else 0.0,
+            "waste_rate": round(self.wasted / self.started, 4) if self.started else 0.0,
+        }
+
+
+def create_speculative_search(tools: List[BaseTool]) -> Optional[SpeculativeSearch]:
+    tool = next((t for t in tools if t.name == SEARCH_TOOL), None)
+    if tool is None:
+        logger.warning(f"Speculative search disabled: no '{SEARCH_TOOL}' tool")
+        return None
+    return SpeculativeSearch(tool)
@@ -30,3 +30,9 @@ class AgentState(BaseModel):
         default_factory=list
     )
     next_step: Optional[Literal["context", "reply"]] = None
+
+    # Research loop budget of the current turn (see src/agent/budget.py).
+    deadline: Optional[float] = None
+    max_tool_rounds: Optional[int] = None
+    tool_rounds: int = 0
+    budget_exhausted: Optional[str] = None
@@ -0,0 +1,15 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from src.services.agent_service import get_agent_service, AgentService
+
+router = APIRouter()
+
+
+@router.delete("/cache/answers")
+async def invalidate_answers(
+    question: Optional[str] = None,
+    service: AgentService = Depends(get_agent_service),
+):
+    if not service.answer_cache:
+        raise HTTPException(status_code=404, detail="Answer cache disabled")
+    return {"invalidated": service.answer_cache.invalidate(question)}
@@ -1,19 +1,95 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from uuid import uuid4
+
+from fastapi import APIRouter, Depends, Header, HTTPException
 from fastapi.responses import StreamingResponse
-from src.api.schemas import ChatRequest
+from starlette.background import BackgroundTask
+from src.api.schemas import BatchRequest, ChatRequest
+from src.agent.budget import Budget
+from src.services.admission import Overloaded
+from src.core.config import get_settings
 from src.services.agent_service import get_agent_service, AgentService
+from src.services.stream_protocol import StreamEncoder, negotiate
 
 router = APIRouter()
 
 
+async def _admit(service: AgentService, thread_id: str):
+    if not service.ready:
+        raise HTTPException(status_code=503, detail="Agent not initialized")
+    try:
+        return await service.admit(thread_id)
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
 @router.post("/chat")
 async def chat(
-    request: ChatRequest, service: AgentService = Depends(get_agent_service)
+    request: ChatRequest,
+    service: AgentService = Depends(get_agent_service),
+    x_stream_protocol: Optional[str] = Header(default=None),
+    accept: Optional[str] = Header(default=None),
 ):
-    if not service.agent:
-        raise HTTPException(status_code=503, detail="Agent not initialized")
+    encoder = StreamEncoder(
+        *negotiate(
+            request.stream_protocol, request.stream_format, x_stream_protocol, accept
+        )
+    )
+    ticket = await _admit(service, request.thread_id)
+
+    return StreamingResponse(
+        service.chat_stream(
+            request.message,
+            request.thread_id,
+            stream_tokens=request.stream_tokens,
+            include_timings=request.include_timings,
+            budget=Budget.for_request(
+                request.deadline_seconds, request.max_tool_rounds
+            ),
+            ticket=ticket,
+            encoder=encoder,
+        ),
+        media_type=encoder.media_type,
+        # Also frees the slot if the client disconnects before streaming starts.
+        background=BackgroundTask(ticket.release) if ticket else None,
+    )
+
+
+@router.post("/chat/batch")
+async def chat_batch(
+    request: BatchRequest, service: AgentService = Depends(get_agent_service)
+):
+    settings = get_settings()
+    if len(request.messages) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.batch_max_items} messages per batch",
+        )
+    thread_prefix = request.thread_prefix or f"batch-{uuid4().hex[:12]}"
+    ticket = await _admit(service, thread_prefix)
+    concurrency = min(
+        request.concurrency or settings.batch_max_concurrency,
+        settings.batch_max_concurrency,
+    )
+    if ticket:
+        # Every question in flight holds a global admission slot: the batch
+        # runs as many at once as slots were free, up to its concurrency.
+        concurrency = 1 + await service.admission.extend(ticket, concurrency - 1)
 
     return StreamingResponse(
-        service.chat_stream(request.message, request.thread_id),
-        media_type="text/event-stream",
+        service.batch_stream(
+            request.messages,
+            concurrency,
+            budget=Budget.for_request(
+                request.deadline_seconds, request.max_tool_rounds
+            ),
+            thread_prefix=thread_prefix,
+            ticket=ticket,
+        ),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(ticket.release) if ticket else None,
     )
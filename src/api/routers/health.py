@@ -0,0 +1,23 @@
+import os
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from src.services.agent_service import get_agent_service, AgentService
+
+router = APIRouter()
+
+
+@router.get("/healthz")
+async def healthz():
+    """Liveness: the worker process is up and serving its event loop."""
+    return {"status": "ok", "pid": os.getpid()}
+
+
+@router.get("/readyz")
+async def readyz(service: AgentService = Depends(get_agent_service)):
+    """Readiness: this worker can answer chat requests right now."""
+    readiness = service.readiness()
+    readiness["pid"] = os.getpid()
+    if not readiness["ready"]:
+        return JSONResponse(status_code=503, content=readiness)
+    return readiness
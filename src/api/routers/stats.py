@@ -0,0 +1,9 @@
+from fastapi import APIRouter, Depends
+from src.services.agent_service import get_agent_service, AgentService
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def stats(service: AgentService = Depends(get_agent_service)):
+    return await service.stats()
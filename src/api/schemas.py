@@ -1,9 +1,28 @@
 
-from pydantic import BaseModel
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
 
 class ChatRequest(BaseModel):
     message: str
     thread_id: str
+    stream_tokens: bool = False
+    include_timings: bool = False
+    # Research loop budget; unset uses the server defaults, 0 disables.
+    deadline_seconds: Optional[float] = Field(default=None, ge=0, le=600)
+    max_tool_rounds: Optional[int] = Field(default=None, ge=0, le=20)
+    # Stream format; unset falls back to the X-Stream-Protocol and Accept
+    # headers, then to v1 over SSE.
+    stream_protocol: Optional[Literal["v1", "v2"]] = None
+    stream_format: Optional[Literal["sse", "ndjson"]] = None
+
+class BatchRequest(BaseModel):
+    messages: List[str] = Field(min_length=1)
+    # Threads are named "<thread_prefix>-<index>"; a random prefix by default.
+    thread_prefix: Optional[str] = None
+    concurrency: Optional[int] = Field(default=None, ge=1)
+    deadline_seconds: Optional[float] = Field(default=None, ge=0, le=600)
+    max_tool_rounds: Optional[int] = Field(default=None, ge=0, le=20)
 
 class ChatResponse(BaseModel):
     response: str
@@ -1,6 +1,6 @@
 from functools import lru_cache
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Any, Dict, List, Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -9,13 +9,175 @@ class Settings(BaseSettings):
     groq_router_model: str = "llama-3.3-70b-versatile"
     ollama_model: str = "PetrosStav/gemma3-tools:4b"
     ollama_base_url: str = "http://localhost:11434"
+    # How long Ollama keeps the model loaded after a call; pinning keeps it
+    # loaded for good so its KV cache survives idle periods
+    ollama_keep_alive: str = "30m"
+    ollama_pin_model: bool = False
+    # Context window shared by all roles and the warmup (a different num_ctx
+    # reloads the model); unset keeps the model's default
+    ollama_num_ctx: Optional[int] = None
     host: str = "0.0.0.0"
     port: int = 8000
+    # Worker processes of the production server (python -m src.main
+    # --production); unset there means one per CPU core.
+    workers: Optional[int] = None
+    graceful_shutdown_seconds: float = 30
+
+    # Checkpoint storage and retention
+    checkpoint_db_path: str = "checkpoints.db"
+    checkpoint_retention_enabled: bool = True
+    checkpoint_keep_last: int = 10
+    checkpoint_thread_ttl_seconds: Optional[float] = 30 * 24 * 3600
+    checkpoint_prune_interval_seconds: float = 300
+    checkpoint_vacuum_pages: int = 1000
+    checkpoint_busy_timeout_ms: int = 10000
+
+    # Shared LLM clients
+    llm_pool_size: int = 20
+    llm_timeout_seconds: float = 120
+    llm_connect_timeout_seconds: float = 10
+    llm_keepalive_expiry_seconds: float = 60
+    llm_warmup: bool = True
+    # Concurrent LLM calls per provider; providers not listed are unlimited
+    llm_max_concurrency: Dict[str, int] = {"groq": 8, "ollama": 2}
+
+    # Provider routing for node LLM calls. Providers in order of preference
+    # (unset: only Groq when configured, else only Ollama); with hedging on,
+    # a call still waiting after the preferred provider's p95 latency gets a
+    # hedge on the next one
+    llm_providers: Optional[List[str]] = None
+    llm_hedge_enabled: bool = False
+    llm_hedge_min_delay_seconds: float = 0.25
+    # Hedge delay until a provider has llm_latency_min_samples latencies
+    llm_hedge_initial_delay_seconds: float = 3.0
+    llm_latency_window: int = 200
+    llm_latency_min_samples: int = 20
+    # Circuit breaker: a provider is skipped for llm_circuit_cooldown_seconds
+    # after this many consecutive failures, or once llm_circuit_error_rate of
+    # its recent calls failed
+    llm_circuit_failure_threshold: int = 5
+    llm_circuit_error_rate: float = 0.5
+    llm_circuit_cooldown_seconds: float = 30
+
+    # Admission control for chat requests
+    admission_enabled: bool = True
+    admission_max_concurrent: int = 32
+    admission_max_queue: int = 64
+    admission_queue_timeout_seconds: Optional[float] = 30
+    admission_max_pending_per_thread: int = 4
+
+    # Batch endpoint: questions per request and how many run at once
+    batch_max_items: int = 500
+    batch_max_concurrency: int = 8
+
+    # Graph layout: "two_stage" (router call, then research or reply) or
+    # "single_pass" (one tool-bound call routes and starts the research)
+    graph_topology: Literal["two_stage", "single_pass"] = "two_stage"
+
+    # Context compaction: approximate token budget per node
+    compaction_enabled: bool = True
+    node_token_budgets: Dict[str, int] = {
+        "router": 1000,
+        "context": 8000,
+        "triage": 8000,
+        "synthesize": 24000,
+        "reply": 4000,
+    }
+
+    # Rank article passages against the question before synthesis and keep
+    # the best ones within this many (approximate) tokens
+    passage_reduction_enabled: bool = True
+    passage_budget_tokens: int = 4000
+    passage_max_chars: int = 1200
+
+    # Whole-answer cache for first-turn research questions
+    answer_cache_enabled: bool = True
+    answer_cache_ttl_seconds: float = 3600
+    answer_cache_max_entries: int = 5000
+
+    # Share one graph run between concurrent identical first-turn questions
+    coalesce_requests: bool = True
+
+    # Router fast path
+    router_fast_path_enabled: bool = True
+    router_fast_path_threshold: float = 0.85
+    router_memo_size: int = 10000
+    router_memo_ttl_seconds: float = 24 * 3600
+
+    # MCP server sessions. "stdio" runs the server as child processes;
+    # "inprocess" builds it with mcp_server_factory(**mcp_server_kwargs) on a
+    # thread of each worker, without pipes or JSON encoding
+    mcp_transport: Literal["stdio", "inprocess"] = "stdio"
+    mcp_server_command: Optional[str] = None
+    mcp_server_args: List[str] = ["-m", "wikipedia_mcp"]
+    mcp_server_factory: str = "wikipedia_mcp.server:create_server"
+    mcp_server_kwargs: Dict[str, Any] = {}
+    mcp_pool_size: int = 2
+    # Cap on MCP server children across all workers; unset runs
+    # mcp_pool_size children in every worker.
+    mcp_max_children: Optional[int] = None
+    mcp_session_concurrency: int = 4
+    tool_call_timeout_seconds: float = 30
+    # Tool schemas from the last start, so the graph is built without
+    # waiting for list_tools; refreshed from the server once ready
+    tool_schema_cache_path: Optional[str] = "tool_schemas.json"
+
+    # Start answering /healthz and /readyz before initialization finishes;
+    # chat requests get 503 until the service is ready
+    startup_in_background: bool = False
+
+    # Research loop budget per turn; requests may override, 0 disables
+    research_deadline_seconds: Optional[float] = 45
+    max_tool_rounds: Optional[int] = 6
+
+    # Run search_wikipedia on the user message while the router decides
+    speculative_search_enabled: bool = False
+
+    # MCP tool result cache
+    tool_cache_enabled: bool = True
+    tool_cache_path: Optional[str] = "tool_cache.db"
+    tool_cache_memory_entries: int = 1024
+    tool_cache_default_ttl_seconds: float = 3600
+    tool_cache_default_max_entries: int = 1000
+    tool_cache_ttl_seconds: Dict[str, float] = {
+        "search_wikipedia": 6 * 3600,
+        "get_summary": 24 * 3600,
+        "get_article": 24 * 3600,
+    }
+    tool_cache_max_entries: Dict[str, int] = {
+        "search_wikipedia": 5000,
+        "get_summary": 10000,
+        "get_article": 5000,
+    }
+
+    # Local full-text article store in front of the MCP tools
+    article_store_enabled: bool = False
+    article_store_path: str = "articles.db"
+    article_store_fill_from_tools: bool = True
+    article_store_min_search_results: int = 3
+    # Max age of articles filled from tool results; None keeps them forever.
+    article_store_ttl_seconds: Optional[float] = 7 * 24 * 3600
 
     @property
     def use_groq(self) -> bool:
         return bool(self.groq_api_key)
 
+    @property
+    def ollama_keep_alive_value(self):
+        return -1 if self.ollama_pin_model else self.ollama_keep_alive
+
+    @property
+    def worker_count(self) -> int:
+        return self.workers or 1
+
+    @property
+    def mcp_children_per_worker(self) -> int:
+        # In-process servers are threads, not children.
+        if self.mcp_transport == "inprocess" or not self.mcp_max_children:
+            return self.mcp_pool_size
+        share = max(1, self.mcp_max_children // self.worker_count)
+        return min(self.mcp_pool_size, share)
+
     class Config:
         env_file = ".env"
         extra = "ignore"
@@ -0,0 +1,48 @@
+import os
+import asyncio
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single process, nothing to coordinate with.
+    fcntl = None
+
+
+class FileLock:
+    """Advisory exclusive lock on a file, shared between worker processes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def locked(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        if self._fd is not None:
+            return True
+        if fcntl is None:
+            self._fd = -1
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    async def acquire_async(self, poll_seconds: float = 0.02):
+        """Wait for the lock without blocking the event loop."""
+        while not self.acquire(blocking=False):
+            await asyncio.sleep(poll_seconds)
+
+    def release(self):
+        if self._fd is None:
+            return
+        if self._fd >= 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        self._fd = None
@@ -0,0 +1,270 @@
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import HumanMessage
+
+from src.core.config import Settings, get_settings
+from src.core.metrics import record_llm_slot_wait
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RoleSpec:
+    temperature: float
+    reasoning_hidden: bool = True
+    use_router_model: bool = False
+    # The answer is streamed to the client token by token
+    streamed: bool = False
+
+
+ROLES: Dict[str, RoleSpec] = {
+    # Use llama for routing - it follows structured output better than qwen3
+    "router": RoleSpec(temperature=0, reasoning_hidden=False, use_router_model=True),
+    "context": RoleSpec(temperature=0),
+    "synthesize": RoleSpec(temperature=0, streamed=True),
+    "reply": RoleSpec(temperature=0.7, streamed=True),
+}
+
+
+class LLMRegistry:
+    """Process-wide chat model clients, one per provider/model/sampling setup.
+
+    All models of a provider share one keep-alive HTTP connection pool, so
+    graph nodes reuse warm connections instead of each opening their own.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._models: Dict[Tuple[Any, ...], BaseChatModel] = {}
+        self._http_clients: Dict[str, Tuple[Any, Any]] = {}
+        # (role, provider or None for every provider) -> model
+        self._overrides: Dict[Tuple[str, Optional[str]], BaseChatModel] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def provider(self) -> str:
+        """The preferred provider."""
+        return "groq" if self.settings.use_groq else "ollama"
+
+    @property
+    def providers(self) -> List[str]:
+        """Providers node calls may use, preferred first."""
+        if self.settings.llm_providers:
+            return list(self.settings.llm_providers)
+        # A fallback has to be asked for: a local Ollama may not exist.
+        return [self.provider]
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.settings.llm_pool_size,
+            max_keepalive_connections=self.settings.llm_pool_size,
+            keepalive_expiry=self.settings.llm_keepalive_expiry_seconds,
+        )
+
+    def _timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            self.settings.llm_timeout_seconds,
+            connect=self.settings.llm_connect_timeout_seconds,
+        )
+
+    def _groq_clients(self) -> Tuple[httpx.Client, httpx.AsyncClient]:
+        if "groq" not in self._http_clients:
+            self._http_clients["groq"] = (
+                httpx.Client(limits=self._limits(), timeout=self._timeout()),
+                httpx.AsyncClient(limits=self._limits(), timeout=self._timeout()),
+            )
+        return self._http_clients["groq"]
+
+    def _ollama_clients(self):
+        if "ollama" not in self._http_clients:
+            from ollama import AsyncClient, Client
+
+            kwargs = {"limits": self._limits(), "timeout": self._timeout()}
+            clients = (
+                Client(host=self.settings.ollama_base_url, **kwargs),
+                AsyncClient(host=self.settings.ollama_base_url, **kwargs),
+            )
+            # Fail here, not at shutdown, if ollama stops wrapping httpx.
+            for client in clients:
+                _httpx(client)
+            self._http_clients["ollama"] = clients
+        return self._http_clients["ollama"]
+
+    def _model_name(self, spec: RoleSpec, provider: str) -> str:
+        if provider == "groq":
+            if spec.use_router_model:
+                return self.settings.groq_router_model
+            return self.settings.groq_model
+        return self.settings.ollama_model
+
+    def _build(self, spec: RoleSpec, provider: str) -> BaseChatModel:
+        model = self._model_name(spec, provider)
+        if provider == "groq":
+            from langchain_groq import ChatGroq
+
+            http_client, http_async_client = self._groq_clients()
+            kwargs = {"reasoning_format": "hidden"} if spec.reasoning_hidden else {}
+            return ChatGroq(
+                model=model,
+                api_key=self.settings.groq_api_key,
+                temperature=spec.temperature,
+                http_client=http_client,
+                http_async_client=http_async_client,
+                **kwargs,
+            )
+        else:
+            from langchain_ollama import ChatOllama
+
+            llm = ChatOllama(
+                model=model,
+                base_url=self.settings.ollama_base_url,
+                temperature=spec.temperature,
+                keep_alive=self.settings.ollama_keep_alive_value,
+                num_ctx=self.settings.ollama_num_ctx,
+            )
+            _set_ollama_clients(llm, self._ollama_clients())
+            return llm
+
+    def override(
+        self, role: str, llm: BaseChatModel, provider: Optional[str] = None
+    ):
+        """Serve ``llm`` for ``role`` instead of a provider model (benchmarks).
+
+        Without ``provider`` it stands in for every provider.
+        """
+        self._overrides[(role, provider)] = llm
+
+    def _override(self, role: str, provider: str) -> Optional[BaseChatModel]:
+        return self._overrides.get((role, provider)) or self._overrides.get(
+            (role, None)
+        )
+
+    def get(self, role: str, provider: Optional[str] = None) -> BaseChatModel:
+        provider = provider or self.provider
+        override = self._override(role, provider)
+        if override is not None:
+            return override
+        spec = ROLES[role]
+        key = (provider, self._model_name(spec, provider), spec)
+        llm = self._models.get(key)
+        if llm is None:
+            llm = self._build(spec, provider)
+            self._models[key] = llm
+        return llm
+
+    @asynccontextmanager
+    async def slot(
+        self, role: str, provider: Optional[str] = None
+    ) -> AsyncIterator[None]:
+        """Hold one of the provider's concurrent-call slots for an LLM call."""
+        provider = provider or self.provider
+        limit = self.settings.llm_max_concurrency.get(provider)
+        if not limit:
+            yield
+            return
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            semaphore = self._semaphores[provider] = asyncio.Semaphore(limit)
+        start = time.perf_counter()
+        async with semaphore:
+            record_llm_slot_wait(provider, time.perf_counter() - start)
+            yield
+
+    def stats(self) -> dict:
+        return {
+            provider: {
+                "limit": self.settings.llm_max_concurrency.get(provider),
+                "available": semaphore._value,
+            }
+            for provider, semaphore in self._semaphores.items()
+        }
+
+    async def _warmup_one(self, key: Tuple[Any, ...], llm: BaseChatModel):
+        provider, model, _ = key
+        start = time.perf_counter()
+        try:
+            if provider == "ollama":
+                # An empty prompt loads the model into memory without generating;
+                # it must use the same num_ctx as the calls or they reload it.
+                _, async_client = self._ollama_clients()
+                num_ctx = self.settings.ollama_num_ctx
+                await async_client.generate(
+                    model=model,
+                    prompt="",
+                    keep_alive=self.settings.ollama_keep_alive_value,
+                    options={"num_ctx": num_ctx} if num_ctx else None,
+                )
+            else:
+                await llm.ainvoke([HumanMessage(content="ping")], max_tokens=1)
+            logger.info(
+                f"Warmed up {provider}:{model} in {time.perf_counter() - start:.2f}s"
+            )
+        except Exception as e:
+            logger.warning(f"Warm-up of {provider}:{model} failed: {e}")
+
+    async def warmup(self):
+        for provider in self.providers:
+            for role in ROLES:
+                if self._override(role, provider) is None:
+                    self.get(role, provider)
+        # Models differing only in sampling share a connection and weights.
+        distinct = {}
+        for key, llm in self._models.items():
+            distinct.setdefault(key[:2], (key, llm))
+        await asyncio.gather(*(self._warmup_one(k, m) for k, m in distinct.values()))
+
+    async def aclose(self):
+        for sync_client, async_client in self._http_clients.values():
+            # Ollama wraps its httpx clients; Groq is given them directly.
+            _httpx(sync_client).close()
+            await _httpx(async_client).aclose()
+        self._http_clients.clear()
+        self._models.clear()
+
+
+def _httpx(client: Any) -> Any:
+    if isinstance(client, (httpx.Client, httpx.AsyncClient)):
+        return client
+    inner = getattr(client, "_client", None)
+    if not isinstance(inner, (httpx.Client, httpx.AsyncClient)):
+        raise RuntimeError(
+            f"{type(client).__module__}.{type(client).__name__} no longer keeps "
+            "its httpx client in _client; update LLMRegistry for this ollama version"
+        )
+    return inner
+
+
+# ChatOllama does not accept clients, so its private ones are replaced.
+_OLLAMA_CLIENT_ATTRS = ("_client", "_async_client")
+
+
+def _set_ollama_clients(llm: BaseChatModel, clients: Tuple[Any, Any]):
+    private = getattr(type(llm), "__private_attributes__", {})
+    missing = [name for name in _OLLAMA_CLIENT_ATTRS if name not in private]
+    if missing:
+        raise RuntimeError(
+            f"ChatOllama has no {', '.join(missing)}; this langchain-ollama "
+            "version cannot share the registry's HTTP clients, update LLMRegistry"
+        )
+    llm._client, llm._async_client = clients
+
+
+@lru_cache()
+def get_llm_registry() -> LLMRegistry:
+    return LLMRegistry(get_settings())
+
+
+def get_llm(role: str) -> BaseChatModel:
+    return get_llm_registry().get(role)
+
+
+def llm_slot(role: str, provider: Optional[str] = None):
+    return get_llm_registry().slot(role, provider)
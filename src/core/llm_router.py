@@ -0,0 +1,378 @@
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, message_chunk_to_message
+from langchain_core.runnables import Runnable
+
+from src.core.config import Settings
+from src.core.llm import ROLES, LLMRegistry, get_llm_registry
+from src.core.metrics import record_circuit_opened, record_llm_call, record_llm_hedge
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    """Stops sending calls to a provider that keeps failing.
+
+    Once ``cooldown_seconds`` have passed a single trial call is let through;
+    its outcome closes the circuit again or restarts the cooldown.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        error_rate: float,
+        window: int,
+        min_calls: int,
+        cooldown_seconds: float,
+    ):
+        self.failure_threshold = failure_threshold
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.cooldown_seconds = cooldown_seconds
+        self.state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    def allow(self) -> bool:
+        """Whether a call may start now; claims the trial of a half-open circuit."""
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.cooldown_seconds:
+                return False
+            self.state = HALF_OPEN
+            self._trial_running = False
+        if self.state == HALF_OPEN:
+            if self._trial_running:
+                return False
+            self._trial_running = True
+        return True
+
+    def failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def record(self, success: bool) -> bool:
+        """Record a finished call; True when this opened the circuit."""
+        self._outcomes.append(success)
+        self._consecutive_failures = 0 if success else self._consecutive_failures + 1
+        if self.state == HALF_OPEN:
+            self._trial_running = False
+            if success:
+                self.state = CLOSED
+                self._outcomes.clear()
+                return False
+            return self._open()
+        if self.state == OPEN or success:
+            return False
+        if self._consecutive_failures >= self.failure_threshold or (
+            len(self._outcomes) >= self.min_calls
+            and self.failure_rate() >= self.error_rate
+        ):
+            return self._open()
+        return False
+
+    def record_cancelled(self):
+        # A cancelled trial says nothing about the provider; allow another.
+        if self.state == HALF_OPEN:
+            self._trial_running = False
+
+    def _open(self) -> bool:
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        return True
+
+
+class ProviderHealth:
+    """Rolling latencies (per role) and error rate of one provider."""
+
+    def __init__(self, name: str, settings: Settings):
+        self.name = name
+        self.min_samples = settings.llm_latency_min_samples
+        self.window = settings.llm_latency_window
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.llm_circuit_failure_threshold,
+            error_rate=settings.llm_circuit_error_rate,
+            window=settings.llm_latency_window,
+            min_calls=settings.llm_latency_min_samples,
+            cooldown_seconds=settings.llm_circuit_cooldown_seconds,
+        )
+        self._latencies: Dict[str, Deque[float]] = {}
+        self.calls = 0
+        self.errors = 0
+
+    def quantile(self, role: str, q: float) -> Optional[float]:
+        samples = self._latencies.get(role)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def observe(self, role: str, seconds: float):
+        samples = self._latencies.get(role)
+        if samples is None:
+            samples = self._latencies[role] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def record(self, role: str, seconds: float, error: bool = False):
+        self.calls += 1
+        if error:
+            self.errors += 1
+        else:
+            self.observe(role, seconds)
+        record_llm_call(self.name, role, seconds, error)
+        if self.breaker.record(not error):
+            record_circuit_opened(self.name)
+            logger.warning(
+                f"Circuit for LLM provider {self.name} opened "
+                f"(failure rate {self.breaker.failure_rate():.0%})"
+            )
+
+    def stats(self) -> dict:
+        return {
+            "circuit": self.breaker.state,
+            "calls": self.calls,
+            "errors": self.errors,
+            "recent_failure_rate": round(self.breaker.failure_rate(), 3),
+            "p95_seconds": {
+                role: round(p95, 4)
+                for role in self._latencies
+                if (p95 := self.quantile(role, 0.95)) is not None
+            },
+        }
+
+
+@dataclass
+class _Answer:
+    """An attempt that produced output: the whole message, or for streamed
+    roles the first chunk plus the rest of the stream."""
+
+    provider: str
+    message: Any
+    rest: Optional[AsyncIterator] = None
+    cleanup: Optional[AsyncExitStack] = None
+    started: float = 0.0
+
+
+class LLMRouter:
+    """Sends node LLM calls to the healthiest provider and hedges slow ones.
+
+    A call goes to the first provider, in order of preference, whose circuit
+    is closed. If it has not answered within that provider's p95 latency for
+    the role (time to first token for streamed roles), the same call is sent
+    to the next provider and whichever answers first wins; the other is
+    cancelled. A failed call fails over to the next provider right away.
+    """
+
+    def __init__(self, registry: LLMRegistry, settings: Settings):
+        self.registry = registry
+        self.settings = settings
+        self.providers = registry.providers
+        self.health = {p: ProviderHealth(p, settings) for p in self.providers}
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    def hedge_delay(self, provider: str, role: str) -> Optional[float]:
+        if not self.settings.llm_hedge_enabled or len(self.providers) < 2:
+            return None
+        p95 = self.health[provider].quantile(role, 0.95)
+        if p95 is None:
+            return self.settings.llm_hedge_initial_delay_seconds
+        return max(p95, self.settings.llm_hedge_min_delay_seconds)
+
+    def _next_provider(self, tried: List[str]) -> Optional[str]:
+        for provider in self.providers:
+            if provider not in tried and self.health[provider].breaker.allow():
+                return provider
+        return None
+
+    async def _attempt(
+        self, provider: str, role: str, runnable: Runnable, messages: list
+    ) -> _Answer:
+        health = self.health[provider]
+        stack = AsyncExitStack()
+        start = time.perf_counter()
+        try:
+            await stack.enter_async_context(self.registry.slot(role, provider))
+            if not ROLES[role].streamed:
+                message = await runnable.ainvoke(messages)
+                health.record(role, time.perf_counter() - start)
+                await stack.aclose()
+                return _Answer(provider, message)
+            stream = runnable.astream(messages).__aiter__()
+            if hasattr(stream, "aclose"):
+                stack.push_async_callback(stream.aclose)
+            try:
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                first = None
+            health.record(role, time.perf_counter() - start)
+            return _Answer(provider, first, stream, stack, start)
+        except asyncio.CancelledError:
+            # Lost the race: it took at least this long, which keeps the
+            # latency window from forgetting slow calls.
+            health.observe(role, time.perf_counter() - start)
+            health.breaker.record_cancelled()
+            await stack.aclose()
+            raise
+        except Exception as e:
+            logger.warning(f"LLM call to {provider} ({role}) failed: {e!r}")
+            health.record(role, time.perf_counter() - start, error=True)
+            await stack.aclose()
+            raise
+
+    @staticmethod
+    async def _release(results: list):
+        # Attempts that finished alongside the winner still hold a provider
+        # slot and an open stream.
+        for result in results:
+            if isinstance(result, _Answer) and result.cleanup is not None:
+                await result.cleanup.aclose()
+
+    async def _finish(self, role: str, answer: _Answer):
+        if answer.rest is None:
+            return answer.message
+        message = answer.message
+        try:
+            async for chunk in answer.rest:
+                message = chunk if message is None else message + chunk
+        except Exception:
+            self.health[answer.provider].record(
+                role, time.perf_counter() - answer.started, error=True
+            )
+            raise
+        finally:
+            await answer.cleanup.aclose()
+        if message is None:
+            return AIMessage(content="")
+        return message_chunk_to_message(message)
+
+    async def ainvoke(
+        self, role: str, runnable_for: Callable[[str], Runnable], messages: list
+    ):
+        tried: List[str] = []
+        # attempt task -> (provider, is a hedge)
+        attempts: Dict[asyncio.Task, tuple] = {}
+        errors: List[BaseException] = []
+
+        def start(provider: str, hedge: bool = False):
+            tried.append(provider)
+            task = asyncio.create_task(
+                self._attempt(provider, role, runnable_for(provider), messages)
+            )
+            attempts[task] = (provider, hedge)
+
+        # With every circuit open the preferred provider is tried anyway.
+        primary = self._next_provider(tried) or self.providers[0]
+        start(primary)
+        delay = self.hedge_delay(primary, role)
+        hedge_at = time.perf_counter() + delay if delay is not None else None
+        hedged = False
+        try:
+            while True:
+                timeout = None
+                if hedge_at is not None:
+                    timeout = max(0.0, hedge_at - time.perf_counter())
+                done, _ = await asyncio.wait(
+                    attempts, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedge_at = None
+                    provider = self._next_provider(tried)
+                    if provider:
+                        logger.info(
+                            f"Hedging {role} call on {provider} after "
+                            f"{delay:.2f}s without an answer from {primary}"
+                        )
+                        self.hedges += 1
+                        hedged = True
+                        start(provider, hedge=True)
+                    continue
+
+                for task in done:
+                    provider, hedge = attempts.pop(task)
+                    if task.exception() is not None:
+                        errors.append(task.exception())
+                        continue
+                    if hedged:
+                        self.hedge_wins += hedge
+                        record_llm_hedge(role, "hedge" if hedge else "primary")
+                    for loser in attempts:
+                        loser.cancel()
+                    await self._release(
+                        await asyncio.gather(*attempts, return_exceptions=True)
+                    )
+                    attempts.clear()
+                    return await self._finish(role, task.result())
+
+                if not attempts:
+                    provider = self._next_provider(tried)
+                    if provider is None:
+                        raise errors[0]
+                    logger.info(f"Failing over {role} call to {provider}")
+                    self.failovers += 1
+                    hedge_at = None
+                    start(provider)
+        finally:
+            for task in attempts:
+                task.cancel()
+            if attempts:
+                await self._release(
+                    await asyncio.gather(*attempts, return_exceptions=True)
+                )
+
+    def stats(self) -> dict:
+        return {
+            "providers": {p: h.stats() for p, h in self.health.items()},
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+        }
+
+
+class RoutedLLM:
+    """A node's chat model; every call goes through the provider router.
+
+    ``prepare`` adapts each provider's model once, e.g. to bind tools.
+    """
+
+    def __init__(
+        self, role: str, prepare: Optional[Callable[[Any], Runnable]] = None
+    ):
+        self.role = role
+        self.prepare = prepare
+        self._runnables: Dict[str, Runnable] = {}
+
+    def runnable(self, provider: str) -> Runnable:
+        runnable = self._runnables.get(provider)
+        if runnable is None:
+            llm = get_llm_registry().get(self.role, provider)
+            runnable = self.prepare(llm) if self.prepare else llm
+            self._runnables[provider] = runnable
+        return runnable
+
+    async def ainvoke(self, messages: list):
+        return await get_llm_router().ainvoke(self.role, self.runnable, messages)
+
+
+@lru_cache()
+def get_llm_router() -> LLMRouter:
+    registry = get_llm_registry()
+    return LLMRouter(registry, registry.settings)
+
+
+def routed_llm(
+    role: str, prepare: Optional[Callable[[Any], Runnable]] = None
+) -> RoutedLLM:
+    return RoutedLLM(role, prepare)
@@ -0,0 +1,399 @@
+import os
+import time
+import contextvars
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TOKEN_BUCKETS = (16, 64, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+ITERATION_BUCKETS = (0, 1, 2, 3, 4, 5, 6, 8, 10, 15)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(
+        self,
+        key: Tuple[str, ...],
+        const: Sequence[Tuple[str, str]] = (),
+        extra: Sequence[Tuple[str, str]] = (),
+    ):
+        pairs = list(const) + list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+    def _samples(self, const: Sequence[Tuple[str, str]]) -> List[str]:
+        raise NotImplementedError
+
+    def render(self, const: Sequence[Tuple[str, str]] = ()) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self._samples(const),
+        ]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self, const: Sequence[Tuple[str, str]]) -> List[str]:
+        return [
+            f"{self.name}{self._labels(key, const)} {_format(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (non-cumulative), sum, count].
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            state[0][index] += 1
+        state[1] += value
+        state[2] += 1
+
+    def _samples(self, const: Sequence[Tuple[str, str]]) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = self._labels(key, const, [("le", _format(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = self._labels(key, const, [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{self._labels(key, const)} {_format(total)}")
+            lines.append(f"{self.name}_count{self._labels(key, const)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """In-process metrics rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        # Each worker process has its own registry; the label keeps their
+        # series apart when a scraper reaches several of them.
+        const = [("worker", str(os.getpid()))]
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render(const))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_DURATION = REGISTRY.histogram(
+    "wikibot_request_duration_seconds",
+    "Wall time of one chat turn.",
+    ["route", "source"],
+)
+REQUEST_ERRORS = REGISTRY.counter(
+    "wikibot_request_errors_total", "Chat turns that ended in an error."
+)
+NODE_DURATION = REGISTRY.histogram(
+    "wikibot_node_duration_seconds", "Wall time of one graph node run.", ["node"]
+)
+NODE_ERRORS = REGISTRY.counter(
+    "wikibot_node_errors_total", "Graph node runs that raised.", ["node"]
+)
+TOOL_DURATION = REGISTRY.histogram(
+    "wikibot_tool_call_duration_seconds",
+    "Wall time of one MCP tool call.",
+    ["tool", "source"],
+)
+TOOL_ERRORS = REGISTRY.counter(
+    "wikibot_tool_errors_total", "MCP tool calls that failed or timed out.", ["tool"]
+)
+LLM_PROMPT_TOKENS = REGISTRY.histogram(
+    "wikibot_llm_prompt_tokens",
+    "Prompt tokens per LLM call.",
+    ["node"],
+    buckets=TOKEN_BUCKETS,
+)
+LLM_COMPLETION_TOKENS = REGISTRY.histogram(
+    "wikibot_llm_completion_tokens",
+    "Completion tokens per LLM call.",
+    ["node"],
+    buckets=TOKEN_BUCKETS,
+)
+LLM_CACHED_PROMPT_TOKENS = REGISTRY.counter(
+    "wikibot_llm_cached_prompt_tokens_total",
+    "Prompt tokens served from the provider's prompt (KV) cache.",
+    ["node"],
+)
+LLM_PREFILL_DURATION = REGISTRY.histogram(
+    "wikibot_llm_prefill_seconds",
+    "Time the provider spent evaluating the prompt of one LLM call.",
+    ["node"],
+)
+LLM_PROVIDER_LATENCY = REGISTRY.histogram(
+    "wikibot_llm_provider_latency_seconds",
+    "Time until a provider answered an LLM call (first token for streamed roles).",
+    ["provider", "role"],
+)
+LLM_PROVIDER_ERRORS = REGISTRY.counter(
+    "wikibot_llm_provider_errors_total", "LLM calls that failed.", ["provider"]
+)
+LLM_HEDGES = REGISTRY.counter(
+    "wikibot_llm_hedges_total",
+    "LLM calls duplicated to a second provider, by which attempt won.",
+    ["role", "winner"],
+)
+LLM_CIRCUIT_OPENED = REGISTRY.counter(
+    "wikibot_llm_circuit_opened_total",
+    "Times a provider's circuit breaker opened.",
+    ["provider"],
+)
+LLM_SLOT_WAIT = REGISTRY.histogram(
+    "wikibot_llm_slot_wait_seconds",
+    "Time an LLM call waited for its provider's concurrency limit.",
+    ["provider"],
+)
+ADMISSION_WAIT = REGISTRY.histogram(
+    "wikibot_admission_wait_seconds",
+    "Time an admitted chat request waited in the admission queue.",
+)
+ADMISSION_REJECTED = REGISTRY.counter(
+    "wikibot_admission_rejected_total",
+    "Chat requests rejected with 429 by admission control.",
+    ["reason"],
+)
+SYNTHESIS_TOOL_TOKENS = REGISTRY.histogram(
+    "wikibot_synthesis_tool_tokens",
+    "Estimated tool output tokens before and after passage reduction.",
+    ["stage"],
+    buckets=TOKEN_BUCKETS,
+)
+BUDGET_EXHAUSTED = REGISTRY.counter(
+    "wikibot_budget_exhausted_total",
+    "Research loops cut short by their latency or tool-round budget.",
+    ["reason"],
+)
+CONTEXT_ITERATIONS = REGISTRY.histogram(
+    "wikibot_context_iterations",
+    "Context node runs (research loop iterations) per chat turn.",
+    buckets=ITERATION_BUCKETS,
+)
+
+
+@dataclass
+class RequestTimings:
+    """Everything measured while serving a single chat turn."""
+
+    source: str = "graph"
+    started: float = field(default_factory=time.perf_counter)
+    nodes: List[dict] = field(default_factory=list)
+    tools: List[dict] = field(default_factory=list)
+    tokens: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    errors: int = 0
+    budget_exhausted: Optional[str] = None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def count(self, node: str) -> int:
+        return sum(1 for n in self.nodes if n["node"] == node)
+
+    def as_dict(self) -> dict:
+        return {
+            "source": self.source,
+            "total_seconds": round(self.elapsed(), 4),
+            "nodes": self.nodes,
+            "tools": self.tools,
+            "tokens": self.tokens,
+            "context_iterations": self.count("context"),
+            "budget_exhausted": self.budget_exhausted,
+            "errors": self.errors,
+        }
+
+
+_current_timings: contextvars.ContextVar[Optional[RequestTimings]] = (
+    contextvars.ContextVar("request_timings", default=None)
+)
+
+
+def start_request_timings() -> RequestTimings:
+    timings = RequestTimings()
+    _current_timings.set(timings)
+    return timings
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current_timings.get()
+
+
+def record_node(node: str, seconds: float, error: bool = False):
+    NODE_DURATION.observe(seconds, node=node)
+    if error:
+        NODE_ERRORS.inc(node=node)
+    timings = current_timings()
+    if timings is not None:
+        entry = {"node": node, "seconds": round(seconds, 4)}
+        if error:
+            entry["error"] = True
+            timings.errors += 1
+        timings.nodes.append(entry)
+
+
+def record_tool_call(tool: str, seconds: float, source: str, error: bool = False):
+    TOOL_DURATION.observe(seconds, tool=tool, source=source)
+    if error:
+        TOOL_ERRORS.inc(tool=tool)
+    timings = current_timings()
+    if timings is not None:
+        entry = {"tool": tool, "source": source, "seconds": round(seconds, 4)}
+        if error:
+            entry["error"] = True
+            timings.errors += 1
+        timings.tools.append(entry)
+
+
+def record_llm_usage(
+    node: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    cached_tokens: int = 0,
+    prefill_seconds: Optional[float] = None,
+):
+    LLM_PROMPT_TOKENS.observe(prompt_tokens, node=node)
+    LLM_COMPLETION_TOKENS.observe(completion_tokens, node=node)
+    LLM_CACHED_PROMPT_TOKENS.inc(cached_tokens, node=node)
+    if prefill_seconds is not None:
+        LLM_PREFILL_DURATION.observe(prefill_seconds, node=node)
+    timings = current_timings()
+    if timings is not None:
+        usage = timings.tokens.setdefault(
+            node, {"prompt": 0, "cached": 0, "completion": 0}
+        )
+        usage["prompt"] += prompt_tokens
+        usage["cached"] += cached_tokens
+        usage["completion"] += completion_tokens
+
+
+def prompt_cache_stats() -> Dict[str, dict]:
+    """Per node prompt tokens, cached prompt tokens and mean prefill time."""
+    stats = {}
+    for (node,), (_, prompt_tokens, calls) in sorted(LLM_PROMPT_TOKENS._values.items()):
+        cached = LLM_CACHED_PROMPT_TOKENS.value(node=node)
+        prefill = LLM_PREFILL_DURATION._values.get((node,))
+        stats[node] = {
+            "calls": calls,
+            "prompt_tokens": int(prompt_tokens),
+            "cached_tokens": int(cached),
+            "hit_rate": round(cached / prompt_tokens, 3) if prompt_tokens else 0.0,
+            "mean_prefill_seconds": (
+                round(prefill[1] / prefill[2], 4) if prefill else None
+            ),
+        }
+    return stats
+
+
+def record_llm_call(provider: str, role: str, seconds: float, error: bool = False):
+    if error:
+        LLM_PROVIDER_ERRORS.inc(provider=provider)
+    else:
+        LLM_PROVIDER_LATENCY.observe(seconds, provider=provider, role=role)
+
+
+def record_llm_hedge(role: str, winner: str):
+    LLM_HEDGES.inc(role=role, winner=winner)
+
+
+def record_circuit_opened(provider: str):
+    LLM_CIRCUIT_OPENED.inc(provider=provider)
+
+
+def record_llm_slot_wait(provider: str, seconds: float):
+    LLM_SLOT_WAIT.observe(seconds, provider=provider)
+
+
+def record_admission(seconds: float, rejected: Optional[str] = None):
+    if rejected:
+        ADMISSION_REJECTED.inc(reason=rejected)
+    else:
+        ADMISSION_WAIT.observe(seconds)
+
+
+def record_reduction(before: int, after: int):
+    SYNTHESIS_TOOL_TOKENS.observe(before, stage="before")
+    SYNTHESIS_TOOL_TOKENS.observe(after, stage="after")
+
+
+def record_budget_exhausted(reason: str):
+    BUDGET_EXHAUSTED.inc(reason=reason)
+    timings = current_timings()
+    if timings is not None:
+        timings.budget_exhausted = reason
+
+
+def record_request(timings: RequestTimings, route: Optional[str], error: bool = False):
+    REQUEST_DURATION.observe(
+        timings.elapsed(), route=route or "unknown", source=timings.source
+    )
+    if error:
+        REQUEST_ERRORS.inc()
+    if timings.source == "graph" and route == "context":
+        CONTEXT_ITERATIONS.observe(timings.count("context"))
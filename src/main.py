@@ -2,12 +2,14 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
+import argparse
 import os
 import sys
+from typing import Optional
 
 from src.core.config import get_settings
 from src.core.logging import setup_logging
-from src.api.routers import chat
+from src.api.routers import cache, chat, health, metrics, stats
 from src.services.agent_service import agent_service
 
 
@@ -15,7 +17,10 @@ from src.services.agent_service import agent_service
 async def lifespan(app: FastAPI):
     # Startup
     setup_logging()
-    await agent_service.initialize()
+    if get_settings().startup_in_background:
+        agent_service.start_in_background()
+    else:
+        await agent_service.initialize()
     yield
     # Shutdown
     await agent_service.shutdown()
@@ -33,6 +38,10 @@ app.add_middleware(
 )
 
 app.include_router(chat.router, prefix="/api/v1", tags=["chat"])
+app.include_router(stats.router, prefix="/api/v1", tags=["stats"])
+app.include_router(cache.router, prefix="/api/v1", tags=["cache"])
+app.include_router(metrics.router, tags=["metrics"])
+app.include_router(health.router, tags=["health"])
 
 
 def start():
@@ -40,5 +49,41 @@ def start():
     uvicorn.run("src.main:app", host=settings.host, port=settings.port, reload=True)
 
 
+def serve(workers: Optional[int] = None):
+    """Production server: several worker processes and no reloader.
+
+    Every worker runs the lifespan on its own, with its own MCP children,
+    checkpoint connection and in-memory caches. ``/metrics``, ``/api/v1/stats``,
+    ``DELETE /api/v1/cache/answers``, request coalescing and the router memo
+    are therefore per worker.
+    """
+    settings = get_settings()
+    workers = workers or settings.workers or os.cpu_count() or 1
+    # Workers read their settings from the environment they inherit.
+    os.environ["WORKERS"] = str(workers)
+    get_settings.cache_clear()
+    uvicorn.run(
+        "src.main:app",
+        host=settings.host,
+        port=settings.port,
+        workers=workers,
+        reload=False,
+        access_log=False,
+        timeout_graceful_shutdown=settings.graceful_shutdown_seconds,
+    )
+
+
 if __name__ == "__main__":
-    start()
+    parser = argparse.ArgumentParser(description="Wiki-Bot MCP Agent server")
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        help="multi-worker server, no reload; caches, coalescing, /metrics and "
+        "/api/v1/stats are per worker",
+    )
+    parser.add_argument("--workers", type=int, help="worker processes (production)")
+    args = parser.parse_args()
+    if args.production:
+        serve(args.workers)
+    else:
+        start()
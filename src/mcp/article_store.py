@@ -0,0 +1,410 @@
+"""Local full-text Wikipedia article store served in front of the MCP tools.
+
+Bulk-load it from a dump converted to JSON lines (one ``{"title", "text",
+"summary"?, "url"?}`` object per line, e.g. WikiExtractor ``--json`` output,
+optionally .gz/.bz2 compressed) and inspect it with::
+
+    python -m src.mcp.article_store ingest enwiki.jsonl.bz2
+    python -m src.mcp.article_store stats
+"""
+
+import re
+import bz2
+import sys
+import gzip
+import json
+import time
+import asyncio
+import sqlite3
+import logging
+import argparse
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from src.agent.references import article_url
+
+logger = logging.getLogger(__name__)
+
+STORE_TOOLS = {"search_wikipedia", "get_summary", "get_article"}
+
+SOURCE_DUMP = "dump"
+SOURCE_MCP = "mcp"
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "did", "do", "does", "for",
+    "from", "how", "in", "is", "it", "of", "on", "or", "the", "to", "was",
+    "what", "when", "where", "which", "who", "whom", "why", "with",
+}
+_WORD = re.compile(r"\w+")
+_SUMMARY_ERRORS = ("No Wikipedia article found", "Error retrieving summary")
+
+SCHEMA = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+CREATE TABLE IF NOT EXISTS articles (
+    key TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    url TEXT,
+    summary TEXT,
+    text TEXT,
+    source TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, summary, content='articles', content_rowid='rowid',
+    tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, summary)
+    VALUES (new.rowid, new.title, new.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, summary)
+    VALUES ('delete', old.rowid, old.title, old.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, summary)
+    VALUES ('delete', old.rowid, old.title, old.summary);
+    INSERT INTO articles_fts (rowid, title, summary)
+    VALUES (new.rowid, new.title, new.summary);
+END;
+"""
+
+# Re-ingesting an unchanged dump article is a no-op, so incremental loads
+# only rewrite (and re-index) what changed; tool fills always refresh.
+UPSERT = """
+INSERT INTO articles (key, title, url, summary, text, source, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    title = excluded.title,
+    url = COALESCE(excluded.url, articles.url),
+    summary = COALESCE(excluded.summary, articles.summary),
+    text = COALESCE(excluded.text, articles.text),
+    source = excluded.source,
+    updated_at = excluded.updated_at
+WHERE excluded.source != 'dump'
+    OR articles.summary IS NOT COALESCE(excluded.summary, articles.summary)
+    OR articles.text IS NOT COALESCE(excluded.text, articles.text)
+"""
+
+
+def title_key(title: str) -> str:
+    # Titles are case-sensitive after the first letter: "Red Dwarf" (the
+    # series) and "Red dwarf" (the star) are different articles.
+    title = " ".join(title.replace("_", " ").split())
+    return title[:1].upper() + title[1:]
+
+
+def lead_paragraph(text: str, min_chars: int = 300, max_chars: int = 2000) -> str:
+    """First paragraph(s) of an article body, used when no summary is given."""
+    lead = []
+    size = 0
+    for paragraph in text.split("\n"):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        lead.append(paragraph)
+        size += len(paragraph)
+        if size >= min_chars:
+            break
+    return "\n".join(lead)[:max_chars]
+
+
+def _match_query(query: str) -> Optional[str]:
+    words = [w for w in _WORD.findall(query.casefold()) if w not in _STOPWORDS]
+    # Quoted terms, implicitly ANDed: every remaining word must match.
+    return " ".join(f'"{w}"' for w in words) or None
+
+
+class ArticleStore:
+    """SQLite FTS5 index of Wikipedia articles.
+
+    Serves ``search_wikipedia``, ``get_summary`` and ``get_article`` in the
+    same shape as wikipedia_mcp, and is filled from dumps (``ingest``) or
+    from the results of tool calls that missed it.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: Optional[float] = None,
+        min_search_results: int = 3,
+        fill_from_tools: bool = True,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.min_search_results = min_search_results
+        self.fill_from_tools = fill_from_tools
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _migrate(self):
+        (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+        if version < 1:
+            # Keys used to be casefolded whole titles.
+            self._conn.create_function("title_key", 1, title_key, deterministic=True)
+            self._conn.execute("UPDATE articles SET key = title_key(title)")
+            self._conn.execute("PRAGMA user_version = 1")
+            self._conn.commit()
+
+    def _count(self, tool_name: str, field: str):
+        counters = self._counters.setdefault(
+            tool_name, {"hits": 0, "stale_hits": 0, "misses": 0, "fills": 0}
+        )
+        counters[field] += 1
+
+    def _cutoff(self, allow_stale: bool) -> float:
+        if allow_stale or not self.ttl_seconds:
+            return 0.0
+        return time.time() - self.ttl_seconds
+
+    def _row(self, title: str, cutoff: float) -> Optional[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT title, url, summary, text FROM articles "
+                "WHERE key = ? AND (source = ? OR updated_at >= ?)",
+                (title_key(title), SOURCE_DUMP, cutoff),
+            ).fetchone()
+
+    def _search(self, query: str, limit: int, cutoff: float) -> Optional[dict]:
+        match = _match_query(query)
+        if not match:
+            return None
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT a.title, snippet(articles_fts, 1, '', '', '...', 24) "
+                "FROM articles_fts JOIN articles a ON a.rowid = articles_fts.rowid "
+                "WHERE articles_fts MATCH ? AND (a.source = ? OR a.updated_at >= ?) "
+                "ORDER BY bm25(articles_fts, 10.0, 1.0) LIMIT ?",
+                (match, SOURCE_DUMP, cutoff, limit),
+            ).fetchall()
+        # Too few local matches means the store probably lacks the topic.
+        if len(rows) < min(limit, self.min_search_results):
+            return None
+        return {
+            "query": query,
+            "results": [{"title": title, "snippet": snippet} for title, snippet in rows],
+        }
+
+    def _lookup(
+        self, tool_name: str, arguments: Dict[str, Any], allow_stale: bool
+    ) -> Optional[dict]:
+        cutoff = self._cutoff(allow_stale)
+        if tool_name == "search_wikipedia":
+            query = arguments.get("query")
+            if not isinstance(query, str):
+                return None
+            return self._search(query, int(arguments.get("limit") or 10), cutoff)
+
+        title = arguments.get("title")
+        if not isinstance(title, str) or not title.strip():
+            return None
+        row = self._row(title, cutoff)
+        if row is None:
+            return None
+        found_title, url, summary, text = row
+        if tool_name == "get_summary" and summary:
+            return {"title": found_title, "summary": summary}
+        if tool_name == "get_article" and text:
+            return {
+                "title": found_title,
+                "exists": True,
+                "url": url or article_url(found_title),
+                "summary": summary,
+                "text": text,
+            }
+        return None
+
+    async def lookup(
+        self, tool_name: str, arguments: Dict[str, Any], allow_stale: bool = False
+    ) -> Optional[dict]:
+        """Result of a tool call served from the store, or None on a miss."""
+        if tool_name not in STORE_TOOLS:
+            return None
+        try:
+            result = await asyncio.to_thread(
+                self._lookup, tool_name, arguments, allow_stale
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Article store lookup for {tool_name} failed: {e}")
+            result = None
+        if result is None:
+            if not allow_stale:
+                self._count(tool_name, "misses")
+        else:
+            self._count(tool_name, "stale_hits" if allow_stale else "hits")
+        return result
+
+    def upsert_many(self, articles: Iterable[dict], source: str = SOURCE_DUMP) -> int:
+        """Insert or update articles; returns the number of rows written."""
+        now = time.time()
+        rows = []
+        for article in articles:
+            title = article.get("title")
+            if not title:
+                continue
+            text = article.get("text") or None
+            summary = article.get("summary") or (text and lead_paragraph(text)) or None
+            rows.append(
+                (
+                    title_key(title),
+                    title,
+                    article.get("url"),
+                    summary,
+                    text,
+                    source,
+                    now,
+                )
+            )
+        with self._lock:
+            cursor = self._conn.executemany(UPSERT, rows)
+            self._conn.commit()
+            return cursor.rowcount
+
+    async def fill(
+        self, tool_name: str, arguments: Dict[str, Any], structured: Optional[dict]
+    ):
+        """Store the article carried by an MCP tool result, if any."""
+        if not self.fill_from_tools or not isinstance(structured, dict):
+            return
+        title = structured.get("title") or arguments.get("title")
+        article = None
+        if tool_name == "get_summary":
+            summary = structured.get("summary")
+            if isinstance(summary, str) and not summary.startswith(_SUMMARY_ERRORS):
+                article = {"title": title, "summary": summary}
+        elif tool_name == "get_article":
+            if structured.get("exists", True) and structured.get("text"):
+                article = {
+                    "title": title,
+                    "url": structured.get("url"),
+                    "summary": structured.get("summary"),
+                    "text": structured.get("text"),
+                }
+        if article is None or not isinstance(title, str):
+            return
+        try:
+            await asyncio.to_thread(self.upsert_many, [article], SOURCE_MCP)
+            self._count(tool_name, "fills")
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to store {tool_name} result for '{title}': {e}")
+
+    def optimize(self):
+        with self._lock:
+            self._conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('optimize')")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            by_source = dict(
+                self._conn.execute(
+                    "SELECT source, COUNT(*) FROM articles GROUP BY source"
+                ).fetchall()
+            )
+            (with_text,) = self._conn.execute(
+                "SELECT COUNT(*) FROM articles WHERE text IS NOT NULL"
+            ).fetchone()
+            (page_count,) = self._conn.execute("PRAGMA page_count").fetchone()
+            (page_size,) = self._conn.execute("PRAGMA page_size").fetchone()
+        tools = {}
+        for tool_name, counters in self._counters.items():
+            lookups = counters["hits"] + counters["misses"]
+            tools[tool_name] = {
+                **counters,
+                "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+            }
+        return {
+            "articles": sum(by_source.values()),
+            "by_source": by_source,
+            "with_text": with_text,
+            "db_bytes": page_count * page_size,
+            "tools": tools,
+        }
+
+    def close(self):
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
+
+
+def create_article_store(settings) -> Optional[ArticleStore]:
+    if not settings.article_store_enabled:
+        return None
+    try:
+        return ArticleStore(
+            settings.article_store_path,
+            ttl_seconds=settings.article_store_ttl_seconds,
+            min_search_results=settings.article_store_min_search_results,
+            fill_from_tools=settings.article_store_fill_from_tools,
+        )
+    except sqlite3.Error as e:
+        logger.error(f"Article store disabled, could not open it: {e}")
+        return None
+
+
+def _open_dump(path: str):
+    if path.endswith(".bz2"):
+        return bz2.open(path, "rt", encoding="utf-8")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def read_dump(path: str) -> Iterator[dict]:
+    with _open_dump(path) as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"{path}:{line_number}: skipping invalid JSON line")
+
+
+def ingest(store: ArticleStore, paths: List[str], batch_size: int = 1000) -> dict:
+    read = written = 0
+    for path in paths:
+        batch = []
+        for article in read_dump(path):
+            batch.append(article)
+            if len(batch) >= batch_size:
+                written += store.upsert_many(batch)
+                read += len(batch)
+                batch = []
+                print(f"\r{read} articles read, {written} written", end="", file=sys.stderr)
+        if batch:
+            written += store.upsert_many(batch)
+            read += len(batch)
+    print(file=sys.stderr)
+    store.optimize()
+    return {"read": read, "written": written}
+
+
+def main():
+    from src.core.config import get_settings
+
+    parser = argparse.ArgumentParser(description="Manage the local article store.")
+    parser.add_argument("--db", default=None, help="store path (ARTICLE_STORE_PATH)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = commands.add_parser("ingest", help="bulk-load JSON lines dumps")
+    ingest_parser.add_argument("paths", nargs="+")
+    ingest_parser.add_argument("--batch-size", type=int, default=1000)
+    commands.add_parser("stats", help="print index statistics")
+    args = parser.parse_args()
+
+    store = ArticleStore(args.db or get_settings().article_store_path)
+    try:
+        if args.command == "ingest":
+            print(json.dumps(ingest(store, args.paths, args.batch_size)))
+        print(json.dumps(store.stats(), indent=2))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import math
+import asyncio
+import logging
+import importlib
+import threading
+from contextlib import asynccontextmanager, nullcontext
+from typing import Any, Callable, Dict, Optional
+
+import anyio
+from anyio.streams.memory import MemoryObjectSendStream
+from mcp import ClientSession
+
+logger = logging.getLogger(__name__)
+
+
+def load_server_factory(spec: str) -> Callable[..., Any]:
+    """The callable named by ``"package.module:function"``."""
+    module_name, _, attr = spec.partition(":")
+    if not module_name or not attr:
+        raise ValueError(
+            f"MCP server factory must look like 'module:function', got {spec!r}"
+        )
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _put(stream: MemoryObjectSendStream, message):
+    try:
+        stream.send_nowait(message)
+    except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+        # The other side is shutting down.
+        pass
+
+
+def _close(stream: MemoryObjectSendStream):
+    stream.close()
+
+
+async def _forward(receive, loop: asyncio.AbstractEventLoop, send):
+    """Hand every message from ``receive`` to ``send`` on another event loop."""
+    async with receive:
+        async for message in receive:
+            loop.call_soon_threadsafe(_put, send, message)
+    loop.call_soon_threadsafe(_close, send)
+
+
+class _ServerThread:
+    """An MCP server on its own event loop in a daemon thread.
+
+    (Fast)MCP servers run sync tools on their event loop. In a child process
+    that only blocks the child; on a thread of its own, likewise, the server
+    blocks itself rather than the service.
+    """
+
+    def __init__(
+        self,
+        create_server: Callable[[], Any],
+        client_loop: asyncio.AbstractEventLoop,
+        to_client: MemoryObjectSendStream,
+    ):
+        self.create_server = create_server
+        self.client_loop = client_loop
+        self.to_client = to_client
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.inbox: Optional[MemoryObjectSendStream] = None
+        self._serving = False
+        self._started: asyncio.Future = client_loop.create_future()
+        self._thread = threading.Thread(
+            target=self._run, name="mcp-inprocess", daemon=True
+        )
+
+    def _notify(self, error: Optional[BaseException] = None):
+        def _set():
+            if self._started.done():
+                return
+            if error is None:
+                self._started.set_result(None)
+            else:
+                self._started.set_exception(error)
+
+        self.client_loop.call_soon_threadsafe(_set)
+
+    def _run(self):
+        try:
+            asyncio.run(self._serve())
+        except BaseException as e:
+            if self._serving:
+                logger.error(f"In-process MCP server stopped: {e}", exc_info=True)
+            self._notify(e)
+
+    async def _serve(self):
+        server = self.create_server()
+        # FastMCP, from the SDK or the fastmcp package, wraps the protocol
+        # server; fastmcp 2 expects its lifespan entered around it.
+        protocol_server = getattr(server, "_mcp_server", server)
+        lifespan = getattr(server, "_lifespan_manager", None)
+
+        inbox, read_stream = anyio.create_memory_object_stream(math.inf)
+        write_stream, outbox = anyio.create_memory_object_stream(math.inf)
+        self.loop = asyncio.get_running_loop()
+        self.inbox = inbox
+        async with lifespan() if lifespan else nullcontext():
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(_forward, outbox, self.client_loop, self.to_client)
+                self._serving = True
+                self._notify()
+                await protocol_server.run(
+                    read_stream,
+                    write_stream,
+                    protocol_server.create_initialization_options(),
+                )
+                tg.cancel_scope.cancel()
+
+    async def start(self):
+        self._thread.start()
+        await self._started
+
+    async def stop(self):
+        if self.loop is not None and self._thread.is_alive():
+            self.loop.call_soon_threadsafe(_close, self.inbox)
+        # A tool call still blocking the server thread holds this up.
+        await asyncio.to_thread(self._thread.join)
+
+
+@asynccontextmanager
+async def mcp_inprocess_context(
+    server_factory: Callable[..., Any], kwargs: Optional[Dict[str, Any]] = None
+):
+    """A client session with an MCP server built by ``server_factory``.
+
+    The server runs in this process and messages are handed over as objects,
+    skipping the stdio pipe and JSON-RPC encoding.
+    """
+    client_loop = asyncio.get_running_loop()
+    to_client, read_stream = anyio.create_memory_object_stream(math.inf)
+    write_stream, to_server = anyio.create_memory_object_stream(math.inf)
+    server = _ServerThread(
+        lambda: server_factory(**(kwargs or {})), client_loop, to_client
+    )
+    await server.start()
+    try:
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(_forward, to_server, server.loop, server.inbox)
+            async with ClientSession(read_stream, write_stream) as session:
+                await session.initialize()
+                yield session
+            tg.cancel_scope.cancel()
+    finally:
+        await server.stop()
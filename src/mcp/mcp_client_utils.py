@@ -1,14 +1,24 @@
 import sys
+import json
+import time
 import shutil
 import asyncio
-from typing import List, Any, Dict, Optional
-from contextlib import asynccontextmanager
+import contextvars
+from typing import List, Any, Dict, Optional, Union
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
 
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
-from langchain_core.tools import StructuredTool
+from mcp.types import Tool
+from langchain_core.tools import StructuredTool, ToolException
 from pydantic import create_model
 
+from src.mcp.session_pool import MCPSessionPool
+from src.mcp.tool_cache import ToolResultCache
+from src.mcp.article_store import ArticleStore
+from src.core.metrics import record_tool_call
+
 
 class MCPClientManager:
     def __init__(
@@ -65,6 +75,34 @@ class MCPClientManager:
         return langchain_tools
 
 
+# Small, well-known fields of structured tool results kept as the
+# ToolMessage artifact (never article bodies).
+ARTIFACT_FIELDS = ("title", "url", "exists", "error")
+
+
+def _structured(structured: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not isinstance(structured, dict):
+        return None
+    # Some servers wrap non-model return values as {"result": ...}.
+    if set(structured) == {"result"} and isinstance(structured["result"], dict):
+        return structured["result"]
+    return structured
+
+
+def _artifact(structured: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if structured is None:
+        return None
+    return {
+        k: structured[k]
+        for k in ARTIFACT_FIELDS
+        if isinstance(structured.get(k), (str, bool, int))
+    }
+
+
+def _stored_result(result: Dict[str, Any]) -> tuple[List[str], Dict[str, Any]]:
+    return [json.dumps(result, ensure_ascii=False)], _artifact(result)
+
+
 @asynccontextmanager
 async def mcp_server_context(command: str, args: List[str]):
     async with stdio_client(
@@ -76,40 +114,126 @@ async def mcp_server_context(command: str, args: List[str]):
             yield session
 
 
-async def load_mcp_tools(session: ClientSession) -> List[StructuredTool]:
-    result = await session.list_tools()
+# time.time() by which tool calls must be done, set around a graph step.
+_tool_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "tool_deadline", default=None
+)
+
+
+@contextmanager
+def tool_deadline(deadline: Optional[float]):
+    """Cap every tool call made inside the block at ``deadline``."""
+    token = _tool_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _tool_deadline.reset(token)
+
+
+def _call_timeout(timeout: Optional[float]) -> tuple[Optional[float], bool]:
+    """Timeout of a tool call starting now, and whether the deadline set it."""
+    deadline = _tool_deadline.get()
+    if deadline is None:
+        return timeout, False
+    remaining = max(deadline - time.time(), 0.0)
+    if timeout is None or remaining < timeout:
+        return remaining, True
+    return timeout, False
+
+
+_JSON_TYPES = {"string": str, "integer": int, "boolean": bool, "number": float}
+
+
+@lru_cache(maxsize=256)
+def _input_model(tool_name: str, schema_json: str):
+    # Keyed by the schema text: a refresh that changes nothing reuses the
+    # models built at startup.
+    schema = json.loads(schema_json)
+    props = schema.get("properties", {})
+    required = schema.get("required", [])
+
+    fields = {}
+    for field_name, field_info in props.items():
+        field_type = _JSON_TYPES.get(field_info.get("type"), Any)
+        default = ... if field_name in required else None
+        fields[field_name] = (field_type, default)
+
+    return create_model(f"{tool_name}Input", **fields)
+
+
+async def load_mcp_tools(
+    session: Union[ClientSession, MCPSessionPool],
+    cache: Optional[ToolResultCache] = None,
+    timeout: Optional[float] = None,
+    store: Optional[ArticleStore] = None,
+    tools: Optional[List[Tool]] = None,
+) -> List[StructuredTool]:
+    """LangChain tools calling ``session``.
+
+    ``tools`` are definitions known already (e.g. cached from an earlier
+    start); without them the server is asked with ``list_tools``.
+    """
+    if tools is None:
+        tools = (await session.list_tools()).tools
     langchain_tools = []
 
-    for tool in result.tools:
+    for tool in tools:
 
         async def _wrapper(tool_name=tool.name, **kwargs):
-            res = await session.call_tool(tool_name, arguments=kwargs)
-            return [c.text for c in res.content if c.type == "text"]
-
-        schema = tool.inputSchema or {}
-        props = schema.get("properties", {})
-        required = schema.get("required", [])
-
-        fields = {}
-        for field_name, field_info in props.items():
-            field_type = Any
-            t = field_info.get("type")
-            if t == "string":
-                field_type = str
-            elif t == "integer":
-                field_type = int
-            elif t == "boolean":
-                field_type = bool
-            elif t == "number":
-                field_type = float
-
-            default = ... if field_name in required else None
-            fields[field_name] = (field_type, default)
-
-        if not fields:
-            InputModel = create_model(f"{tool.name}Input")
-        else:
-            InputModel = create_model(f"{tool.name}Input", **fields)
+            start = time.perf_counter()
+            if store is not None:
+                stored = await store.lookup(tool_name, kwargs)
+                if stored is not None:
+                    record_tool_call(tool_name, time.perf_counter() - start, "store")
+                    return _stored_result(stored)
+
+            if cache is not None:
+                cached = await cache.get(tool_name, kwargs)
+                if isinstance(cached, dict):
+                    record_tool_call(tool_name, time.perf_counter() - start, "cache")
+                    return cached["content"], cached.get("artifact")
+
+            call_timeout, at_deadline = _call_timeout(timeout)
+            try:
+                res = await asyncio.wait_for(
+                    session.call_tool(tool_name, arguments=kwargs), call_timeout
+                )
+            except Exception as e:
+                record_tool_call(tool_name, time.perf_counter() - start, "mcp", True)
+                # Wikipedia being slow or down: an expired local copy beats
+                # no answer.
+                if store is not None:
+                    stored = await store.lookup(tool_name, kwargs, allow_stale=True)
+                    if stored is not None:
+                        return _stored_result(stored)
+                if isinstance(e, asyncio.TimeoutError):
+                    if at_deadline:
+                        raise ToolException(
+                            f"Tool '{tool_name}' stopped at the research deadline"
+                        )
+                    raise ToolException(
+                        f"Tool '{tool_name}' timed out after {timeout} seconds"
+                    )
+                raise
+            record_tool_call(
+                tool_name, time.perf_counter() - start, "mcp", bool(res.isError)
+            )
+            texts = [c.text for c in res.content if c.type == "text"]
+            structured = _structured(res.structuredContent)
+            artifact = _artifact(structured)
+
+            if not res.isError:
+                if cache is not None:
+                    await cache.set(
+                        tool_name, kwargs, {"content": texts, "artifact": artifact}
+                    )
+                if store is not None:
+                    await store.fill(tool_name, kwargs, structured)
+            return texts, artifact
+
+        InputModel = _input_model(
+            tool.name, json.dumps(tool.inputSchema or {}, sort_keys=True)
+        )
 
         lc_tool = StructuredTool.from_function(
             func=None,
@@ -117,6 +241,8 @@ async def load_mcp_tools(session: ClientSession) -> List[StructuredTool]:
             name=tool.name,
             description=tool.description,
             args_schema=InputModel,
+            response_format="content_and_artifact",
+            handle_tool_error=True,
         )
         langchain_tools.append(lc_tool)
 
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncContextManager, Callable, Dict, List, Optional
+
+from mcp import ClientSession
+
+logger = logging.getLogger(__name__)
+
+
+SessionFactory = Callable[[], AsyncContextManager[ClientSession]]
+
+
+@dataclass
+class _Slot:
+    index: int
+    semaphore: asyncio.Semaphore
+    session: Optional[ClientSession] = None
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    stop: asyncio.Event = field(default_factory=asyncio.Event)
+    task: Optional[asyncio.Task] = None
+    error: Optional[BaseException] = None
+    pending: int = 0
+    calls: int = 0
+
+
+class MCPSessionPool:
+    """A pool of MCP client sessions, each backed by its own server.
+
+    Exposes the subset of the ``ClientSession`` API used by ``load_mcp_tools``
+    (``list_tools`` and ``call_tool``) and dispatches every call to the
+    least-busy session. Each session accepts at most ``max_concurrency``
+    calls at a time; further calls wait for a free slot.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory,
+        size: int = 1,
+        max_concurrency: int = 4,
+    ):
+        if size < 1:
+            raise ValueError("MCP session pool size must be at least 1")
+        self.session_factory = session_factory
+        self.size = size
+        self.max_concurrency = max_concurrency
+        self._slots: List[_Slot] = []
+
+    async def _run_slot(self, slot: _Slot):
+        # Each session lives in its own task so that the transport's cancel
+        # scopes are entered and exited from the same task.
+        try:
+            async with self.session_factory() as session:
+                slot.session = session
+                slot.ready.set()
+                await slot.stop.wait()
+        except BaseException as e:
+            slot.error = e
+            slot.ready.set()
+            if not isinstance(e, asyncio.CancelledError):
+                logger.error(f"MCP session {slot.index} failed: {e}", exc_info=True)
+            raise
+        finally:
+            slot.session = None
+
+    async def start(self):
+        self._slots = [
+            _Slot(index=i, semaphore=asyncio.Semaphore(self.max_concurrency))
+            for i in range(self.size)
+        ]
+        for slot in self._slots:
+            slot.task = asyncio.create_task(self._run_slot(slot))
+        await asyncio.gather(*(slot.ready.wait() for slot in self._slots))
+
+        failed = [slot for slot in self._slots if slot.error is not None]
+        if len(failed) == len(self._slots):
+            await self.close()
+            raise RuntimeError("No MCP session could be started") from failed[0].error
+        if failed:
+            logger.warning(
+                f"{len(failed)} of {self.size} MCP sessions failed to start; "
+                f"continuing with {self.size - len(failed)}"
+            )
+        logger.info(f"MCP session pool started with {self.size} session(s)")
+
+    async def close(self):
+        for slot in self._slots:
+            slot.stop.set()
+        tasks = [slot.task for slot in self._slots if slot.task]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._slots = []
+
+    async def __aenter__(self) -> "MCPSessionPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _live_slots(self) -> List[_Slot]:
+        return [slot for slot in self._slots if slot.session is not None]
+
+    def _pick_slot(self) -> _Slot:
+        slots = self._live_slots()
+        if not slots:
+            raise RuntimeError("MCP session pool has no live sessions")
+        return min(slots, key=lambda slot: slot.pending)
+
+    async def list_tools(self):
+        return await self._pick_slot().session.list_tools()
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None):
+        slot = self._pick_slot()
+        slot.pending += 1
+        try:
+            async with slot.semaphore:
+                slot.calls += 1
+                return await slot.session.call_tool(name, arguments=arguments)
+        finally:
+            slot.pending -= 1
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "live": len(self._live_slots()),
+            "max_concurrency": self.max_concurrency,
+            "sessions": [
+                {"index": slot.index, "pending": slot.pending, "calls": slot.calls}
+                for slot in self._slots
+            ],
+        }
@@ -0,0 +1,224 @@
+import json
+import time
+import asyncio
+import hashlib
+import sqlite3
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from src.core.cache import TTLCache
+from src.mcp.article_store import title_key
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ToolCachePolicy:
+    ttl_seconds: float
+    max_entries: int
+
+
+# Free-text arguments compared without case. Titles are case-sensitive
+# after the first letter ("Red Dwarf" vs "Red dwarf"); other strings only
+# have their whitespace normalized.
+_FREE_TEXT_ARGS = {"query"}
+_TITLE_ARGS = {"title"}
+
+
+def _normalize(value: Any, name: Optional[str] = None) -> Any:
+    if isinstance(value, str):
+        if name in _TITLE_ARGS:
+            return title_key(value)
+        value = " ".join(value.split())
+        return value.casefold() if name in _FREE_TEXT_ARGS else value
+    if isinstance(value, dict):
+        return {
+            k: _normalize(v, k) for k, v in sorted(value.items()) if v is not None
+        }
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v, name) for v in value]
+    return value
+
+
+def make_cache_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+    """Build a stable key from the tool name and its normalized arguments."""
+    payload = json.dumps(_normalize(arguments), sort_keys=True, ensure_ascii=False)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"{tool_name}:{digest}"
+
+
+class ToolResultCache:
+    """Two-tier cache for MCP tool results.
+
+    Lookups hit an in-memory LRU first and fall back to an SQLite file that
+    survives restarts. Each tool has its own TTL and size limit.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str],
+        policies: Dict[str, ToolCachePolicy],
+        default_policy: ToolCachePolicy,
+        memory_entries: int = 1024,
+    ):
+        self.path = path
+        self.policies = policies
+        self.default_policy = default_policy
+        self.memory_entries = memory_entries
+        self._memory: Dict[str, TTLCache] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.executescript(
+                """
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                CREATE TABLE IF NOT EXISTS tool_cache (
+                    key TEXT PRIMARY KEY,
+                    tool TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_tool_cache_tool_created
+                    ON tool_cache (tool, created_at);
+                """
+            )
+
+    def policy_for(self, tool_name: str) -> ToolCachePolicy:
+        return self.policies.get(tool_name, self.default_policy)
+
+    def _memory_for(self, tool_name: str) -> TTLCache:
+        cache = self._memory.get(tool_name)
+        if cache is None:
+            policy = self.policy_for(tool_name)
+            cache = TTLCache(
+                maxsize=min(self.memory_entries, policy.max_entries),
+                ttl=policy.ttl_seconds,
+            )
+            self._memory[tool_name] = cache
+        return cache
+
+    def _count(self, tool_name: str, field: str):
+        counters = self._counters.setdefault(
+            tool_name, {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+        )
+        counters[field] += 1
+
+    def _disk_get(self, key: str) -> Optional[tuple[str, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM tool_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and row[1] <= time.time():
+                self._conn.execute("DELETE FROM tool_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            return row
+
+    def _disk_set(self, key: str, tool_name: str, value: str, policy: ToolCachePolicy):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tool_cache (key, tool, value, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, tool_name, value, now, now + policy.ttl_seconds),
+            )
+            self._conn.execute(
+                "DELETE FROM tool_cache WHERE tool = ? AND key IN ("
+                "SELECT key FROM tool_cache WHERE tool = ? "
+                "ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (tool_name, tool_name, policy.max_entries),
+            )
+            self._conn.commit()
+
+    async def get(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        key = make_cache_key(tool_name, arguments)
+        memory = self._memory_for(tool_name)
+        value = memory.get(key)
+        if value is not None:
+            self._count(tool_name, "memory_hits")
+            return value
+
+        if self._conn is not None:
+            row = await asyncio.to_thread(self._disk_get, key)
+            if row is not None:
+                value = json.loads(row[0])
+                memory.set(key, value, ttl=max(row[1] - time.time(), 0))
+                self._count(tool_name, "disk_hits")
+                return value
+
+        self._count(tool_name, "misses")
+        return None
+
+    async def set(self, tool_name: str, arguments: Dict[str, Any], value: Any):
+        key = make_cache_key(tool_name, arguments)
+        policy = self.policy_for(tool_name)
+        self._memory_for(tool_name).set(key, value)
+        self._count(tool_name, "stores")
+        if self._conn is not None:
+            try:
+                await asyncio.to_thread(
+                    self._disk_set, key, tool_name, json.dumps(value), policy
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to persist cache entry for {tool_name}: {e}")
+
+    def stats(self) -> dict:
+        tools = {}
+        for tool_name, counters in self._counters.items():
+            lookups = (
+                counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+            )
+            hits = counters["memory_hits"] + counters["disk_hits"]
+            tools[tool_name] = {
+                **counters,
+                "memory_size": len(self._memory_for(tool_name)),
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
+        disk_entries = None
+        if self._conn is not None:
+            with self._lock:
+                disk_entries = self._conn.execute(
+                    "SELECT COUNT(*) FROM tool_cache"
+                ).fetchone()[0]
+        return {"tools": tools, "disk_entries": disk_entries}
+
+    def close(self):
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
+
+
+def create_tool_cache(settings) -> Optional[ToolResultCache]:
+    if not settings.tool_cache_enabled:
+        return None
+    tool_names = set(settings.tool_cache_ttl_seconds) | set(
+        settings.tool_cache_max_entries
+    )
+    default_policy = ToolCachePolicy(
+        ttl_seconds=settings.tool_cache_default_ttl_seconds,
+        max_entries=settings.tool_cache_default_max_entries,
+    )
+    policies = {
+        name: ToolCachePolicy(
+            ttl_seconds=settings.tool_cache_ttl_seconds.get(
+                name, default_policy.ttl_seconds
+            ),
+            max_entries=settings.tool_cache_max_entries.get(
+                name, default_policy.max_entries
+            ),
+        )
+        for name in tool_names
+    }
+    return ToolResultCache(
+        path=settings.tool_cache_path,
+        policies=policies,
+        default_policy=default_policy,
+        memory_entries=settings.tool_cache_memory_entries,
+    )
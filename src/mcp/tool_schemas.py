@@ -0,0 +1,70 @@
+import os
+import json
+import hashlib
+import logging
+from typing import List, Optional
+
+from mcp.types import Tool
+
+logger = logging.getLogger(__name__)
+
+
+class ToolSchemaCache:
+    """MCP tool definitions from an earlier start, kept in a JSON file.
+
+    Entries are keyed by the server command line (or factory and arguments
+    for in-process servers), so pointing the service at a different MCP
+    server ignores what an old one advertised.
+    """
+
+    def __init__(self, path: str, command: str, args: List[str]):
+        self.path = path
+        self.key = hashlib.sha256(json.dumps([command, *args]).encode()).hexdigest()
+
+    def load(self) -> Optional[List[Tool]]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("key") != self.key:
+                return None
+            return [Tool.model_validate(tool) for tool in data["tools"]]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable tool schema cache {self.path}: {e}")
+            return None
+
+    def save(self, tools: List[Tool]):
+        data = {
+            "key": self.key,
+            "tools": [tool.model_dump(mode="json", exclude_none=True) for tool in tools],
+        }
+        # Write then rename, so other workers never read a partial file.
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def same_tools(a: List[Tool], b: List[Tool]) -> bool:
+    def dump(tools):
+        return sorted(
+            json.dumps(t.model_dump(mode="json", exclude_none=True), sort_keys=True)
+            for t in tools
+        )
+
+    return dump(a) == dump(b)
+
+
+def create_tool_schema_cache(settings, command: str) -> Optional[ToolSchemaCache]:
+    if not settings.tool_schema_cache_path:
+        return None
+    if settings.mcp_transport == "inprocess":
+        return ToolSchemaCache(
+            settings.tool_schema_cache_path,
+            settings.mcp_server_factory,
+            [json.dumps(settings.mcp_server_kwargs, sort_keys=True)],
+        )
+    return ToolSchemaCache(
+        settings.tool_schema_cache_path, command, settings.mcp_server_args
+    )
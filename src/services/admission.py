@@ -0,0 +1,228 @@
+import os
+import zlib
+import asyncio
+import logging
+import math
+import time
+from typing import Callable, Dict, List, Optional
+
+from src.core.config import Settings
+from src.core.file_lock import FileLock
+from src.core.metrics import record_admission
+
+logger = logging.getLogger(__name__)
+
+# Lock files shared by all threads across worker processes.
+THREAD_LOCK_STRIPES = 1024
+
+
+class Overloaded(Exception):
+    """The request was not admitted; the client should retry later."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Server overloaded ({reason}), retry in {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """Everything held on behalf of one admitted request.
+
+    ``release`` is idempotent, so both the response stream and the
+    response's background task can call it.
+    """
+
+    def __init__(self):
+        self._releases: List[Callable[[], None]] = []
+
+    def on_release(self, release: Callable[[], None]):
+        self._releases.append(release)
+
+    def release(self):
+        releases, self._releases = self._releases, []
+        for release in reversed(releases):
+            release()
+
+
+class ThreadLocks:
+    """One lock per thread id so turns on a thread run one after another.
+
+    With ``lock_dir`` the lock also covers other worker processes, through
+    one of ``THREAD_LOCK_STRIPES`` lock files picked by hashing the thread id.
+    """
+
+    def __init__(self, max_pending: int, lock_dir: Optional[str] = None):
+        self.max_pending = max_pending
+        self.lock_dir = lock_dir
+        if lock_dir:
+            os.makedirs(lock_dir, exist_ok=True)
+        # thread_id -> [lock, holders and waiters]
+        self._locks: Dict[str, list] = {}
+
+    async def acquire(self, thread_id: str) -> Callable[[], None]:
+        entry = self._locks.get(thread_id)
+        if entry is None:
+            entry = self._locks[thread_id] = [asyncio.Lock(), 0]
+        elif self.max_pending and entry[1] >= self.max_pending:
+            raise Overloaded("thread_busy", 1)
+        entry[1] += 1
+        try:
+            await entry[0].acquire()
+        except BaseException:
+            self._forget(thread_id, entry)
+            raise
+
+        file_lock = None
+        if self.lock_dir:
+            stripe = zlib.crc32(thread_id.encode()) % THREAD_LOCK_STRIPES
+            file_lock = FileLock(os.path.join(self.lock_dir, f"{stripe}.lock"))
+            try:
+                await file_lock.acquire_async()
+            except BaseException:
+                entry[0].release()
+                self._forget(thread_id, entry)
+                raise
+
+        def release():
+            if file_lock:
+                file_lock.release()
+            entry[0].release()
+            self._forget(thread_id, entry)
+
+        return release
+
+    def _forget(self, thread_id: str, entry: list):
+        entry[1] -= 1
+        if entry[1] == 0 and self._locks.get(thread_id) is entry:
+            del self._locks[thread_id]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+class AdmissionController:
+    """Global limit on concurrent chat turns with a bounded wait queue.
+
+    Requests beyond ``max_concurrent`` wait in FIFO order; when ``max_queue``
+    requests are already waiting, or a request waited ``queue_timeout_seconds``,
+    it is rejected with ``Overloaded`` right away instead of adding to the
+    backlog.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout_seconds: Optional[float] = None,
+        max_pending_per_thread: int = 0,
+        lock_dir: Optional[str] = None,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.thread_locks = ThreadLocks(max_pending_per_thread, lock_dir)
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {}
+        # Moving average of how long admitted requests hold their slot.
+        self._avg_hold_seconds = 1.0
+
+    def retry_after(self) -> int:
+        """Rough time until a slot frees up for a request arriving now."""
+        backlog = (self.waiting + 1) / self.max_concurrent
+        return max(1, math.ceil(backlog * self._avg_hold_seconds))
+
+    def _reject(self, reason: str) -> Overloaded:
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        record_admission(0.0, rejected=reason)
+        error = Overloaded(reason, self.retry_after())
+        logger.warning(str(error))
+        return error
+
+    async def _acquire_slot(self) -> Callable[[], None]:
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            raise self._reject("queue_full")
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(
+                self._semaphore.acquire(), self.queue_timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            raise self._reject("queue_timeout") from None
+        finally:
+            self.waiting -= 1
+        record_admission(time.perf_counter() - start)
+        self.admitted += 1
+        return self._hold()
+
+    def _hold(self) -> Callable[[], None]:
+        self.active += 1
+        held_since = time.perf_counter()
+
+        def release():
+            held = time.perf_counter() - held_since
+            self._avg_hold_seconds += 0.1 * (held - self._avg_hold_seconds)
+            self.active -= 1
+            self._semaphore.release()
+
+        return release
+
+    async def admit(self, thread_id: str) -> Ticket:
+        """Wait for this thread's previous turn, then for a global slot."""
+        ticket = Ticket()
+        try:
+            ticket.on_release(await self.thread_locks.acquire(thread_id))
+        except Overloaded as error:
+            self.rejected[error.reason] = self.rejected.get(error.reason, 0) + 1
+            record_admission(0.0, rejected=error.reason)
+            raise
+        try:
+            ticket.on_release(await self._acquire_slot())
+        except BaseException:
+            ticket.release()
+            raise
+        return ticket
+
+    async def extend(self, ticket: Ticket, count: int) -> int:
+        """Add up to ``count`` free global slots to ``ticket`` without waiting.
+
+        Returns how many were added; queued requests keep their turn.
+        """
+        added = 0
+        while added < count and not self._semaphore.locked():
+            await self._semaphore.acquire()
+            ticket.on_release(self._hold())
+            added += 1
+        return added
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "locked_threads": len(self.thread_locks),
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "avg_hold_seconds": round(self._avg_hold_seconds, 3),
+        }
+
+
+def create_admission_controller(settings: Settings) -> Optional[AdmissionController]:
+    if not settings.admission_enabled:
+        return None
+    return AdmissionController(
+        max_concurrent=settings.admission_max_concurrent,
+        max_queue=settings.admission_max_queue,
+        queue_timeout_seconds=settings.admission_queue_timeout_seconds,
+        max_pending_per_thread=settings.admission_max_pending_per_thread,
+        # Only needed when other worker processes share the checkpoints.
+        lock_dir=(
+            f"{settings.checkpoint_db_path}.locks"
+            if settings.worker_count > 1
+            else None
+        ),
+    )
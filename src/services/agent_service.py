@@ -1,18 +1,91 @@
 import sys
 import json
+import time
+import asyncio
 import logging
-from typing import AsyncGenerator, Optional
+from typing import AsyncGenerator, List, Optional
+from uuid import uuid4
 
 from dotenv import load_dotenv
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    HumanMessage,
+    ToolMessage,
+)
 from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from langgraph.graph.state import CompiledStateGraph
 
 from src.mcp.mcp_client_utils import mcp_server_context, load_mcp_tools
-from src.agent.graph import create_graph
+from src.mcp.inprocess import load_server_factory, mcp_inprocess_context
+from src.mcp.session_pool import MCPSessionPool
+from src.mcp.tool_cache import ToolResultCache, create_tool_cache
+from src.mcp.article_store import ArticleStore, create_article_store
+from src.mcp.tool_schemas import (
+    ToolSchemaCache,
+    create_tool_schema_cache,
+    same_tools,
+)
+from src.services.checkpoint_retention import CheckpointRetention
+from src.services.answer_cache import AnswerCache, CachedAnswer, question_key
+from src.services.coalescing import SingleFlight
+from src.services.stream_protocol import StreamEncoder
+from src.services.admission import (
+    AdmissionController,
+    Ticket,
+    create_admission_controller,
+)
+from src.agent.graph import REPLY_NODES, create_graph
+from src.agent.budget import Budget
+from src.agent.fast_router import FastRouter
+from src.agent.speculation import SpeculativeSearch, create_speculative_search
+from src.agent.instrumentation import LLMUsageCallbackHandler
+from src.core.config import get_settings
+from src.core.llm import get_llm_registry
+from src.core.llm_router import get_llm_router
+from src.core.metrics import (
+    current_timings,
+    prompt_cache_stats,
+    record_request,
+    start_request_timings,
+)
 
 logger = logging.getLogger(__name__)
 
+# Nodes whose output is the user-facing answer.
+STREAMED_NODES = {"synthesize", "reply"}
+
+
+def _message_text(content) -> str:
+    # Handle case where content might be a list (Gemini format)
+    if isinstance(content, list):
+        text_parts = []
+        for part in content:
+            if isinstance(part, dict) and "text" in part:
+                text_parts.append(part["text"])
+            elif isinstance(part, str):
+                text_parts.append(part)
+        return "\n".join(text_parts)
+    return content or ""
+
+
+def _summarize_events(events: list[dict]) -> tuple[Optional[str], Optional[str], list]:
+    route = next((e["router"] for e in events if "router" in e), None)
+    content = next((e["content"] for e in events if "content" in e), None)
+    references = next(
+        (e["references"] for e in reversed(events) if "references" in e), []
+    )
+    return route, content, references
+
+
+def _budget_event(values: dict) -> dict:
+    return {
+        "budget": {
+            "exhausted": values["budget_exhausted"],
+            "tool_rounds": values.get("tool_rounds", 0),
+        }
+    }
+
 
 class AgentService:
     def __init__(self):
@@ -20,107 +93,596 @@ class AgentService:
         self.agent: Optional[CompiledStateGraph] = None
         self.checkpointer: Optional[AsyncSqliteSaver] = None
         self._checkpointer_cm = None
-        self._mcp_cm = None
-        self._mcp_session = None
+        self.mcp_pool: Optional[MCPSessionPool] = None
+        self.tool_cache: Optional[ToolResultCache] = None
+        self.article_store: Optional[ArticleStore] = None
+        self.fast_router: Optional[FastRouter] = None
+        self.speculative_search: Optional[SpeculativeSearch] = None
+        self.retention: Optional[CheckpointRetention] = None
+        self.answer_cache: Optional[AnswerCache] = None
+        self.single_flight: Optional[SingleFlight] = None
+        self.admission: Optional[AdmissionController] = None
+        # Set once shutdown starts so load balancers stop sending traffic.
+        self.draining = False
+        # Set once initialization has finished; chat requests wait for it.
+        self.ready = False
+        self.startup: dict = {}
+        self.tool_schemas: Optional[ToolSchemaCache] = None
+        self._init_task: Optional[asyncio.Task] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        # LangChain callback handlers attached to every graph run.
+        self.callbacks: list = [LLMUsageCallbackHandler()]
 
     async def initialize(self):
         logger.info("Initializing AgentService...")
-        self._checkpointer_cm = AsyncSqliteSaver.from_conn_string("checkpoints.db")
+        started = time.perf_counter()
+        self.draining = False
+        self.ready = False
+        self.startup = {}
+        settings = get_settings()
+
+        self.tool_cache = create_tool_cache(settings)
+        self.article_store = create_article_store(settings)
+
+        if settings.router_fast_path_enabled:
+            self.fast_router = FastRouter(
+                threshold=settings.router_fast_path_threshold,
+                memo_size=settings.router_memo_size,
+                memo_ttl_seconds=settings.router_memo_ttl_seconds,
+            )
+
+        if settings.answer_cache_enabled:
+            self.answer_cache = AnswerCache(
+                maxsize=settings.answer_cache_max_entries,
+                ttl_seconds=settings.answer_cache_ttl_seconds,
+            )
+
+        if settings.coalesce_requests:
+            self.single_flight = SingleFlight()
+
+        self.admission = create_admission_controller(settings)
+
+        cmd = settings.mcp_server_command or sys.executable
+        args = settings.mcp_server_args
+        self.tool_schemas = create_tool_schema_cache(settings, cmd)
+        cached_tools = self.tool_schemas.load() if self.tool_schemas else None
+
+        mcp_children = settings.mcp_children_per_worker
+        logger.info(
+            f"Starting {mcp_children} MCP Server(s) ({settings.mcp_transport})..."
+        )
+        if settings.mcp_transport == "inprocess":
+            server_factory = load_server_factory(settings.mcp_server_factory)
+            server_kwargs = settings.mcp_server_kwargs
+            session_factory = lambda: mcp_inprocess_context(
+                server_factory, server_kwargs
+            )
+        else:
+            session_factory = lambda: mcp_server_context(cmd, args)
+        self.mcp_pool = MCPSessionPool(
+            session_factory,
+            size=mcp_children,
+            max_concurrency=settings.mcp_session_concurrency,
+        )
+
+        # Independent steps overlap: the MCP children start while the
+        # checkpoint database opens and the LLM clients load and warm up.
+        steps = [
+            self._timed("mcp", self.mcp_pool.start()),
+            self._timed("checkpoints", self._open_checkpoints(settings)),
+        ]
+        if settings.llm_warmup:
+            logger.info("Warming up LLM clients...")
+            steps.append(self._timed("llm_warmup", get_llm_registry().warmup()))
+        await asyncio.gather(*steps)
+
+        if cached_tools is None:
+            logger.info("Connected to MCP Server. Loading tools...")
+            tool_defs = await self._timed("list_tools", self._list_tools())
+            self._save_tool_schemas(tool_defs)
+        else:
+            tool_defs = cached_tools
+        await self._timed("graph", self._build_agent(settings, tool_defs))
+
+        self.ready = True
+        if cached_tools is not None:
+            self._refresh_task = asyncio.create_task(
+                self._refresh_tool_schemas(cached_tools)
+            )
+        self.startup["seconds"] = round(time.perf_counter() - started, 3)
+        self.startup["tool_schemas"] = "server" if cached_tools is None else "cache"
+        logger.info(
+            f"AgentService initialized in {self.startup['seconds']:.2f}s "
+            f"(step seconds: {self.startup})"
+        )
+
+    def start_in_background(self):
+        """Initialize without holding up the server; see ``ready``."""
+
+        def _done(task: asyncio.Task):
+            if not task.cancelled() and task.exception() is not None:
+                logger.error(
+                    "AgentService initialization failed", exc_info=task.exception()
+                )
+
+        self._init_task = asyncio.create_task(self.initialize())
+        self._init_task.add_done_callback(_done)
+
+    async def _timed(self, step: str, awaitable):
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.startup[step] = round(time.perf_counter() - start, 3)
+
+    async def _open_checkpoints(self, settings):
+        self._checkpointer_cm = AsyncSqliteSaver.from_conn_string(
+            settings.checkpoint_db_path
+        )
         self.checkpointer = await self._checkpointer_cm.__aenter__()
+        self.retention = CheckpointRetention(
+            self.checkpointer,
+            settings.checkpoint_db_path,
+            keep_last=settings.checkpoint_keep_last,
+            thread_ttl_seconds=settings.checkpoint_thread_ttl_seconds,
+            interval_seconds=settings.checkpoint_prune_interval_seconds,
+            vacuum_pages=settings.checkpoint_vacuum_pages,
+            busy_timeout_ms=settings.checkpoint_busy_timeout_ms,
+        )
+        await self.retention.configure()
+        if settings.checkpoint_retention_enabled:
+            self.retention.start()
 
-        cmd = sys.executable
-        args = ["-m", "wikipedia_mcp"]
+    async def _list_tools(self) -> list:
+        return (await self.mcp_pool.list_tools()).tools
 
-        logger.info("Starting MCP Server...")
-        self._mcp_cm = mcp_server_context(cmd, args)
-        self._mcp_session = await self._mcp_cm.__aenter__()
+    def _save_tool_schemas(self, tool_defs: list):
+        if not self.tool_schemas:
+            return
+        try:
+            self.tool_schemas.save(tool_defs)
+        except OSError as e:
+            logger.warning(f"Could not save MCP tool schemas: {e}")
 
-        logger.info("Connected to MCP Server. Loading tools...")
-        tools = await load_mcp_tools(self._mcp_session)
+    async def _build_agent(self, settings, tool_defs: list):
+        tools = await load_mcp_tools(
+            self.mcp_pool,
+            cache=self.tool_cache,
+            timeout=settings.tool_call_timeout_seconds,
+            store=self.article_store,
+            tools=tool_defs,
+        )
         logger.info(f"Loaded {len(tools)} tools: {[t.name for t in tools]}")
 
-        self.agent = create_graph(tools, self.checkpointer)
-        logger.info("AgentService initialized successfully.")
+        if settings.speculative_search_enabled:
+            self.speculative_search = create_speculative_search(tools)
+
+        self.agent = create_graph(
+            tools,
+            self.checkpointer,
+            fast_router=self.fast_router,
+            speculative_search=self.speculative_search,
+        )
+
+    async def _refresh_tool_schemas(self, cached_tools: list):
+        """Check the cached schemas against the server once it is up."""
+        try:
+            tool_defs = await self._list_tools()
+        except Exception as e:
+            logger.warning(f"Could not refresh MCP tool schemas: {e}")
+            return
+        if same_tools(cached_tools, tool_defs):
+            return
+        # Turns already running keep the graph they started with.
+        logger.info("MCP tool schemas changed; rebuilding the agent graph")
+        self._save_tool_schemas(tool_defs)
+        await self._build_agent(get_settings(), tool_defs)
 
     async def shutdown(self):
         logger.info("Shutting down AgentService...")
-        if self._mcp_cm:
-            await self._mcp_cm.__aexit__(None, None, None)
-            self._mcp_cm = None
-            self._mcp_session = None
+        self.draining = True
+        self.ready = False
+        for task in (self._init_task, self._refresh_task):
+            if task and not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._init_task = self._refresh_task = None
+        if self.mcp_pool:
+            await self.mcp_pool.close()
+            self.mcp_pool = None
+        if self.retention:
+            await self.retention.stop()
+            self.retention = None
         if self._checkpointer_cm:
             await self._checkpointer_cm.__aexit__(None, None, None)
             self._checkpointer_cm = None
             self.checkpointer = None
+        if self.tool_cache:
+            self.tool_cache.close()
+            self.tool_cache = None
+        if self.article_store:
+            self.article_store.close()
+            self.article_store = None
+        await get_llm_registry().aclose()
         logger.info("AgentService shutdown complete.")
 
-    async def chat_stream(
-        self, message: str, thread_id: str
-    ) -> AsyncGenerator[str, None]:
+    async def stats(self) -> dict:
+        return {
+            "checkpoints": await self.retention.stats() if self.retention else None,
+            "tool_cache": self.tool_cache.stats() if self.tool_cache else None,
+            "article_store": (
+                self.article_store.stats() if self.article_store else None
+            ),
+            "mcp_pool": self.mcp_pool.stats() if self.mcp_pool else None,
+            "router": self.fast_router.stats() if self.fast_router else None,
+            "speculative_search": (
+                self.speculative_search.stats() if self.speculative_search else None
+            ),
+            "answer_cache": self.answer_cache.stats() if self.answer_cache else None,
+            "coalescing": self.single_flight.stats() if self.single_flight else None,
+            "admission": self.admission.stats() if self.admission else None,
+            "llm_slots": get_llm_registry().stats(),
+            "llm_router": get_llm_router().stats(),
+            "startup": self.startup,
+            "prompt_cache": prompt_cache_stats(),
+        }
+
+    async def admit(self, thread_id: str) -> Optional[Ticket]:
+        """Wait for a turn on ``thread_id`` to be allowed to run.
+
+        Raises ``Overloaded`` when the request should be turned away.
+        """
+        if not self.admission:
+            return None
+        return await self.admission.admit(thread_id)
+
+    def readiness(self) -> dict:
+        checks = {
+            "initialized": self.ready,
+            "mcp": bool(self.mcp_pool and self.mcp_pool.stats()["live"]),
+            "accepting": not self.draining,
+        }
+        return {"ready": all(checks.values()), "checks": checks}
+
+    async def _is_first_turn(self, config: dict) -> bool:
+        snapshot = await self.agent.aget_state(config)
+        return not snapshot.values.get("messages")
+
+    async def _record_turn(
+        self, message: str, config: dict, route: str, content: str, references: list
+    ):
+        """Write a turn produced elsewhere into this thread's checkpoint."""
+        await self.agent.aupdate_state(
+            config,
+            {
+                "messages": [HumanMessage(content=message), AIMessage(content=content)],
+                "referenced_article_urls": references,
+                "next_step": route,
+            },
+            as_node=(
+                "synthesize"
+                if route == "context"
+                else REPLY_NODES[get_settings().graph_topology]
+            ),
+        )
+
+    async def _replay_cached_answer(
+        self, message: str, config: dict, cached: CachedAnswer, stream_tokens: bool
+    ) -> AsyncGenerator[dict, None]:
+        # Record the turn so follow-up questions on this thread see it.
+        await self._record_turn(
+            message, config, "context", cached.content, cached.references
+        )
+        for payload in cached.events:
+            if stream_tokens and "content" in payload:
+                yield {"delta": payload["content"]}
+            yield payload
+
+    async def _run_and_cache(
+        self,
+        message: str,
+        config: dict,
+        stream_tokens: bool,
+        cacheable: bool,
+        budget: Budget,
+    ) -> AsyncGenerator[dict, None]:
+        events: list[dict] = []
+        async for payload in self._run_graph(message, config, stream_tokens, budget):
+            if "delta" not in payload:
+                events.append(payload)
+            if "budget" in payload:
+                # Answers from a cut-short research loop are not reused.
+                cacheable = False
+            yield payload
+
+        if cacheable and self.answer_cache:
+            route, content, references = _summarize_events(events)
+            if route == "context" and content:
+                self.answer_cache.set(
+                    message, CachedAnswer(content, references, events)
+                )
+
+    async def stream_events(
+        self,
+        message: str,
+        thread_id: str,
+        stream_tokens: bool = False,
+        include_timings: bool = False,
+        budget: Optional[Budget] = None,
+    ) -> AsyncGenerator[dict, None]:
+        """Run one turn of the graph and yield the client-facing events."""
+        timings = start_request_timings()
+        budget = budget or Budget.for_request()
+        route = None
+        error = False
+        try:
+            async for payload in self._stream_turn(
+                message, thread_id, stream_tokens, budget
+            ):
+                route = payload.get("router", route)
+                yield payload
+        except Exception:
+            error = True
+            raise
+        finally:
+            record_request(timings, route, error)
+
+        if include_timings:
+            yield {"timings": timings.as_dict()}
+
+    async def _stream_turn(
+        self, message: str, thread_id: str, stream_tokens: bool, budget: Budget
+    ) -> AsyncGenerator[dict, None]:
         if not self.agent:
             logger.error("Agent not initialized")
             raise RuntimeError("Agent not initialized")
 
         logger.info(f"Starting chat stream for thread_id: {thread_id}")
-        config = {"configurable": {"thread_id": thread_id}}
+        config = {
+            "configurable": {"thread_id": thread_id},
+            "callbacks": self.callbacks,
+            "recursion_limit": budget.recursion_limit(),
+        }
+        if self.retention:
+            await self.retention.touch(thread_id)
+
+        # Only first turns are cached or coalesced: later turns depend on
+        # thread history.
+        first_turn = bool(
+            self.answer_cache or self.single_flight
+        ) and await self._is_first_turn(config)
+
+        if first_turn and self.answer_cache:
+            cached = self.answer_cache.get(message)
+            if cached is not None:
+                logger.info(f"Answer cache hit for thread_id: {thread_id}")
+                current_timings().source = "answer_cache"
+                async for payload in self._replay_cached_answer(
+                    message, config, cached, stream_tokens
+                ):
+                    yield payload
+                return
+
+        key = question_key(message)
+        if not (first_turn and self.single_flight and key):
+            async for payload in self._run_and_cache(
+                message, config, stream_tokens, first_turn, budget
+            ):
+                yield payload
+            return
+
+        broadcast = self.single_flight.join(key)
+        leader = broadcast is None
+        if leader:
+            # The shared run always streams tokens; subscribers drop them
+            # when they did not ask for them.
+            broadcast = self.single_flight.lead(
+                key,
+                lambda: self._run_and_cache(message, config, True, True, budget),
+            )
+        else:
+            logger.info(f"Coalescing thread_id {thread_id} onto in-flight run")
+            current_timings().source = "coalesced"
+
+        async for payload in broadcast.subscribe():
+            if "delta" in payload and not stream_tokens:
+                continue
+            yield payload
+
+        if not leader:
+            route, content, references = _summarize_events(broadcast.events)
+            if route and content:
+                await self._record_turn(message, config, route, content, references)
+
+    async def _run_graph(
+        self, message: str, config: dict, stream_tokens: bool, budget: Budget
+    ) -> AsyncGenerator[dict, None]:
         input_message = HumanMessage(content=message)
-        # Reset references for new turn but keep messages
+        # Reset references and the research budget for new turn but keep messages
         initial_state = {
             "messages": [input_message],
             "referenced_article_urls": [],
+            **budget.initial_state(),
         }
         latest_references: list[str] = []
+        stream_mode = ["updates", "messages"] if stream_tokens else ["updates"]
+
+        async for mode, event in self.agent.astream(
+            initial_state, config=config, stream_mode=stream_mode
+        ):
+            if mode == "messages":
+                chunk, metadata = event
+                # Only answer tokens are streamed; router/context chunks are
+                # internal and arrive later as updates.
+                if (
+                    isinstance(chunk, AIMessageChunk)
+                    and metadata.get("langgraph_node") in STREAMED_NODES
+                ):
+                    delta = _message_text(chunk.content)
+                    if delta:
+                        yield {"delta": delta}
+                continue
+
+            for node, values in event.items():
+                if not values:
+                    continue
+                if "referenced_article_urls" in values:
+                    latest_references = values["referenced_article_urls"] or []
 
+                if node in STREAMED_NODES and values.get("messages"):
+                    msg = values["messages"][-1]
+                    content = _message_text(getattr(msg, "content", None))
+                    # Handle empty string - fallback to string representation
+                    if not content:
+                        content = str(msg) if msg else None
+                    if content:
+                        payload = {"content": content}
+                        if latest_references:
+                            payload["references"] = latest_references
+                        yield payload
+                elif node == "triage":
+                    # Single-pass routing: a direct answer is the reply. Its
+                    # tokens are not streamed since the call may turn out to
+                    # be research, so the answer is sent as one delta.
+                    next_step = values.get("next_step")
+                    if next_step:
+                        yield {"router": next_step}
+                    if values.get("budget_exhausted"):
+                        yield _budget_event(values)
+                    if next_step == "reply" and values.get("messages"):
+                        content = _message_text(values["messages"][-1].content)
+                        if stream_tokens:
+                            yield {"delta": content}
+                        yield {"content": content}
+                elif node == "context" and values.get("budget_exhausted"):
+                    yield _budget_event(values)
+                elif node == "tools" and values.get("messages"):
+                    for msg in values["messages"]:
+                        payload = {"tool": msg.name}
+                        if latest_references:
+                            payload["references"] = latest_references
+                        yield payload
+                elif node == "router":
+                    next_step = values.get("next_step")
+                    if next_step:
+                        payload = {"router": next_step}
+                        if latest_references:
+                            payload["references"] = latest_references
+                        yield payload
+                    # A speculative search handed over with the route.
+                    for msg in values.get("messages") or []:
+                        if isinstance(msg, ToolMessage):
+                            yield {"tool": msg.name}
+
+        if latest_references:
+            yield {"references": latest_references}
+
+    async def _answer(
+        self, index: int, message: str, thread_id: str, budget: Optional[Budget]
+    ) -> dict:
+        result = {"index": index, "thread_id": thread_id, "message": message}
+        events: list[dict] = []
+        try:
+            async for payload in self.stream_events(
+                message, thread_id, include_timings=True, budget=budget
+            ):
+                events.append(payload)
+        except Exception as e:
+            logger.error(f"Batch item {index} failed: {str(e)}", exc_info=True)
+            result["error"] = str(e)
+            return result
+
+        route, content, references = _summarize_events(events)
+        result.update(route=route, answer=content, references=references)
+        exhausted = next((e["budget"] for e in events if "budget" in e), None)
+        if exhausted:
+            result["budget"] = exhausted
+        result["timings"] = next(e["timings"] for e in events if "timings" in e)
+        return result
+
+    async def answer_batch(
+        self,
+        messages: List[str],
+        concurrency: int,
+        budget: Optional[Budget] = None,
+        thread_prefix: Optional[str] = None,
+    ) -> AsyncGenerator[dict, None]:
+        """Answer independent questions concurrently, yielding in completion order.
+
+        Every question runs as its own task, so each gets its own request
+        timings and thread.
+        """
+        prefix = thread_prefix or f"batch-{uuid4().hex[:12]}"
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(index: int, message: str) -> dict:
+            async with semaphore:
+                return await self._answer(index, message, f"{prefix}-{index}", budget)
+
+        tasks = [asyncio.create_task(run(i, m)) for i, m in enumerate(messages)]
         try:
-            async for event in self.agent.astream(
-                initial_state, config=config, stream_mode="updates"
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # The client went away: stop the questions still in flight.
+            for task in tasks:
+                task.cancel()
+
+    async def batch_stream(
+        self,
+        messages: List[str],
+        concurrency: int,
+        budget: Optional[Budget] = None,
+        thread_prefix: Optional[str] = None,
+        ticket: Optional[Ticket] = None,
+    ) -> AsyncGenerator[str, None]:
+        errors = 0
+        start = time.perf_counter()
+        try:
+            async for result in self.answer_batch(
+                messages, concurrency, budget, thread_prefix
             ):
-                for node, values in event.items():
-                    if "referenced_article_urls" in values:
-                        latest_references = values["referenced_article_urls"] or []
-
-                    if node in ["synthesize", "reply"] and values.get("messages"):
-                        msg = values["messages"][-1]
-                        content = getattr(msg, "content", None)
-                        # Handle case where content might be a list (Gemini format)
-                        if isinstance(content, list):
-                            text_parts = []
-                            for part in content:
-                                if isinstance(part, dict) and "text" in part:
-                                    text_parts.append(part["text"])
-                                elif isinstance(part, str):
-                                    text_parts.append(part)
-                            content = "\n".join(text_parts)
-                        # Handle empty string - fallback to string representation
-                        if not content:
-                            content = str(msg) if msg else None
-                        if content:
-                            payload = {"content": content}
-                            if latest_references:
-                                payload["references"] = latest_references
-                            yield f"data: {json.dumps(payload)}\n\n"
-                    elif node == "tools" and values.get("messages"):
-                        for msg in values["messages"]:
-                            payload = {"tool": msg.name}
-                            if latest_references:
-                                payload["references"] = latest_references
-                            yield f"data: {json.dumps(payload)}\n\n"
-                    elif node == "router":
-                        next_step = values.get("next_step")
-                        if next_step:
-                            payload = {"router": next_step}
-                            if latest_references:
-                                payload["references"] = latest_references
-                            yield f"data: {json.dumps(payload)}\n\n"
-
-            if latest_references:
-                yield f"data: {json.dumps({'references': latest_references})}\n\n"
-
-            yield "data: [DONE]\n\n"
+                errors += "error" in result
+                yield json.dumps(result) + "\n"
+            yield json.dumps(
+                {
+                    "done": True,
+                    "count": len(messages),
+                    "errors": errors,
+                    "seconds": round(time.perf_counter() - start, 4),
+                }
+            ) + "\n"
+        finally:
+            if ticket:
+                ticket.release()
+
+    async def chat_stream(
+        self,
+        message: str,
+        thread_id: str,
+        stream_tokens: bool = False,
+        include_timings: bool = False,
+        budget: Optional[Budget] = None,
+        ticket: Optional[Ticket] = None,
+        encoder: Optional[StreamEncoder] = None,
+    ) -> AsyncGenerator[bytes, None]:
+        encoder = encoder or StreamEncoder()
+        try:
+            async for payload in self.stream_events(
+                message, thread_id, stream_tokens, include_timings, budget
+            ):
+                frame = encoder.event(payload)
+                if frame:
+                    yield frame
+
+            yield encoder.done()
             logger.info(f"Chat stream completed for thread_id: {thread_id}")
         except Exception as e:
             logger.error(f"Error in chat stream: {str(e)}", exc_info=True)
-            yield f"data: [ERROR] {str(e)}\n\n"
+            yield encoder.error(str(e))
+        finally:
+            if ticket:
+                ticket.release()
 
 
 # Global instance
@@ -0,0 +1,63 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from src.core.cache import TTLCache
+
+
+def question_key(question: str) -> str:
+    """Identity of a question for answer reuse.
+
+    Case and whitespace are ignored and so is a trailing "?" or ".", but
+    other punctuation is kept: "C++" and "C" are different questions.
+    """
+    key = " ".join(question.casefold().split())
+    return key[:-1].rstrip() if key.endswith(("?", ".")) else key
+
+
+@dataclass
+class CachedAnswer:
+    content: str
+    references: List[str]
+    # Client-facing events of the original run, in order, minus token deltas.
+    events: List[dict] = field(default_factory=list)
+
+
+class AnswerCache:
+    """Final answers to first-turn research questions, keyed by the question."""
+
+    def __init__(self, maxsize: int = 5000, ttl_seconds: Optional[float] = 3600):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl_seconds)
+        self.stores = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(question: str) -> str:
+        return question_key(question)
+
+    def get(self, question: str) -> Optional[CachedAnswer]:
+        key = self.key(question)
+        if not key:
+            return None
+        return self._cache.get(key)
+
+    def set(self, question: str, answer: CachedAnswer):
+        key = self.key(question)
+        if key:
+            self._cache.set(key, answer)
+            self.stores += 1
+
+    def invalidate(self, question: Optional[str] = None) -> int:
+        if question is None:
+            count = len(self._cache)
+            self._cache.clear()
+        else:
+            count = int(self._cache.pop(self.key(question)) is not None)
+        self.invalidations += count
+        return count
+
+    def stats(self) -> dict:
+        return {
+            **self._cache.stats(),
+            "stores": self.stores,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,229 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Optional
+
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from src.core.file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+
+SQLITE_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-32000",
+    "PRAGMA mmap_size=268435456",
+]
+
+
+class CheckpointRetention:
+    """Keeps checkpoints.db bounded.
+
+    Keeps only the latest ``keep_last`` checkpoints per thread, deletes
+    threads idle for longer than ``thread_ttl_seconds`` and returns freed
+    pages to the file system with incremental vacuum, all from a background
+    task that shares the saver's connection and lock.
+
+    Several worker processes may share the database: setup runs in one
+    process at a time and only the process holding the retention lock file
+    prunes; the others take over if it exits.
+    """
+
+    def __init__(
+        self,
+        saver: AsyncSqliteSaver,
+        path: str,
+        keep_last: int = 10,
+        thread_ttl_seconds: Optional[float] = None,
+        interval_seconds: float = 300,
+        vacuum_pages: int = 1000,
+        busy_timeout_ms: int = 5000,
+    ):
+        if keep_last < 1:
+            raise ValueError("keep_last must be at least 1")
+        self.saver = saver
+        self.path = path
+        self.keep_last = keep_last
+        self.thread_ttl_seconds = thread_ttl_seconds
+        self.interval_seconds = interval_seconds
+        self.vacuum_pages = vacuum_pages
+        self.busy_timeout_ms = busy_timeout_ms
+        self._leader_lock = FileLock(f"{path}.retention.lock")
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.checkpoints_pruned = 0
+        self.writes_pruned = 0
+        self.threads_expired = 0
+        self.last_run_at: Optional[float] = None
+        self.last_run_seconds: Optional[float] = None
+
+    async def configure(self):
+        """Apply tuned pragmas and create the thread activity table."""
+        init_lock = FileLock(f"{self.path}.init.lock")
+        await init_lock.acquire_async()
+        try:
+            await self._configure()
+        finally:
+            init_lock.release()
+
+    async def _configure(self):
+        conn = self.saver.conn
+        # Wait for other processes' write transactions instead of failing.
+        await conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        await self.saver.setup()
+        async with self.saver.lock:
+            for pragma in SQLITE_PRAGMAS:
+                await conn.execute(pragma)
+
+            # auto_vacuum only takes effect after a full VACUUM; do it once.
+            async with conn.execute("PRAGMA auto_vacuum") as cur:
+                (auto_vacuum,) = await cur.fetchone()
+            if auto_vacuum != 2:
+                logger.info("Enabling incremental auto_vacuum on checkpoint DB...")
+                await conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                await conn.commit()
+                await conn.execute("VACUUM")
+
+            await conn.execute(
+                "CREATE TABLE IF NOT EXISTS thread_activity ("
+                "thread_id TEXT PRIMARY KEY, last_seen REAL NOT NULL)"
+            )
+            # Threads written before retention existed start their TTL now.
+            await conn.execute(
+                "INSERT OR IGNORE INTO thread_activity (thread_id, last_seen) "
+                "SELECT DISTINCT thread_id, ? FROM checkpoints",
+                (time.time(),),
+            )
+            await conn.commit()
+
+    async def touch(self, thread_id: str):
+        async with self.saver.lock:
+            await self.saver.conn.execute(
+                "INSERT INTO thread_activity (thread_id, last_seen) VALUES (?, ?) "
+                "ON CONFLICT(thread_id) DO UPDATE SET last_seen = excluded.last_seen",
+                (thread_id, time.time()),
+            )
+            await self.saver.conn.commit()
+
+    async def prune_once(self) -> dict:
+        start = time.perf_counter()
+        conn = self.saver.conn
+        expired = checkpoints = writes = 0
+        async with self.saver.lock:
+            if self.thread_ttl_seconds:
+                cutoff = time.time() - self.thread_ttl_seconds
+                async with conn.execute(
+                    "SELECT thread_id FROM thread_activity WHERE last_seen < ?",
+                    (cutoff,),
+                ) as cur:
+                    idle = [row[0] for row in await cur.fetchall()]
+                for thread_id in idle:
+                    await conn.execute(
+                        "DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,)
+                    )
+                    await conn.execute(
+                        "DELETE FROM writes WHERE thread_id = ?", (thread_id,)
+                    )
+                    await conn.execute(
+                        "DELETE FROM thread_activity WHERE thread_id = ?", (thread_id,)
+                    )
+                expired = len(idle)
+
+            cur = await conn.execute(
+                "DELETE FROM checkpoints WHERE rowid IN ("
+                "SELECT rowid FROM (SELECT rowid, ROW_NUMBER() OVER ("
+                "PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC"
+                ") AS rn FROM checkpoints) WHERE rn > ?)",
+                (self.keep_last,),
+            )
+            checkpoints = cur.rowcount
+            cur = await conn.execute(
+                "DELETE FROM writes WHERE NOT EXISTS ("
+                "SELECT 1 FROM checkpoints c WHERE c.thread_id = writes.thread_id "
+                "AND c.checkpoint_ns = writes.checkpoint_ns "
+                "AND c.checkpoint_id = writes.checkpoint_id)"
+            )
+            writes = cur.rowcount
+            await conn.commit()
+            # The vacuum only advances as its result rows are stepped through.
+            async with conn.execute(
+                f"PRAGMA incremental_vacuum({int(self.vacuum_pages)})"
+            ) as cur:
+                await cur.fetchall()
+            await conn.commit()
+            async with conn.execute("PRAGMA wal_checkpoint(TRUNCATE)") as cur:
+                await cur.fetchall()
+
+        self.runs += 1
+        self.threads_expired += expired
+        self.checkpoints_pruned += checkpoints
+        self.writes_pruned += writes
+        self.last_run_at = time.time()
+        self.last_run_seconds = time.perf_counter() - start
+        result = {
+            "threads_expired": expired,
+            "checkpoints_pruned": checkpoints,
+            "writes_pruned": writes,
+        }
+        logger.info(f"Checkpoint retention run: {result}")
+        return result
+
+    async def _run(self):
+        while True:
+            if not self._leader_lock.acquire(blocking=False):
+                await asyncio.sleep(self.interval_seconds)
+                continue
+            try:
+                await self.prune_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Checkpoint retention run failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._leader_lock.release()
+
+    async def stats(self) -> dict:
+        conn = self.saver.conn
+        async with self.saver.lock:
+            async with conn.execute("PRAGMA page_count") as cur:
+                (page_count,) = await cur.fetchone()
+            async with conn.execute("PRAGMA page_size") as cur:
+                (page_size,) = await cur.fetchone()
+            async with conn.execute("PRAGMA freelist_count") as cur:
+                (freelist,) = await cur.fetchone()
+            async with conn.execute("SELECT COUNT(*) FROM checkpoints") as cur:
+                (checkpoint_rows,) = await cur.fetchone()
+            async with conn.execute("SELECT COUNT(*) FROM thread_activity") as cur:
+                (threads,) = await cur.fetchone()
+        wal_path = f"{self.path}-wal"
+        return {
+            "db_bytes": page_count * page_size,
+            "wal_bytes": os.path.getsize(wal_path) if os.path.exists(wal_path) else 0,
+            "free_pages": freelist,
+            "checkpoints": checkpoint_rows,
+            "threads": threads,
+            "leader": self._leader_lock.locked,
+            "runs": self.runs,
+            "checkpoints_pruned": self.checkpoints_pruned,
+            "writes_pruned": self.writes_pruned,
+            "threads_expired": self.threads_expired,
+            "last_run_at": self.last_run_at,
+            "last_run_seconds": self.last_run_seconds,
+        }
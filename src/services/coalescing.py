@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from typing import AsyncGenerator, AsyncIterator, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Broadcast:
+    """Fans one event stream out to any number of subscribers.
+
+    Subscribers that join late first receive every event published so far,
+    so all of them see the same sequence.
+    """
+
+    def __init__(self):
+        self.events: List[dict] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self._changed = asyncio.Condition()
+
+    async def publish(self, event: dict):
+        async with self._changed:
+            self.events.append(event)
+            self._changed.notify_all()
+
+    async def finish(self, error: Optional[BaseException] = None):
+        async with self._changed:
+            self.done = True
+            self.error = error
+            self._changed.notify_all()
+
+    async def subscribe(self) -> AsyncGenerator[dict, None]:
+        self.subscribers += 1
+        index = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(
+                    lambda: index < len(self.events) or self.done
+                )
+                pending = self.events[index:]
+                finished = self.done
+            for event in pending:
+                yield event
+            index += len(pending)
+            if finished and index >= len(self.events):
+                break
+        if self.error is not None:
+            raise self.error
+
+
+class SingleFlight:
+    """At most one in-flight run per key; identical requests share its events."""
+
+    def __init__(self):
+        self._inflight: Dict[str, Broadcast] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def join(self, key: str) -> Optional[Broadcast]:
+        broadcast = self._inflight.get(key)
+        if broadcast is not None:
+            self.followers += 1
+        return broadcast
+
+    def lead(self, key: str, source: Callable[[], AsyncIterator[dict]]) -> Broadcast:
+        broadcast = Broadcast()
+        self._inflight[key] = broadcast
+        self.leaders += 1
+        # The run is detached from the leader's request so that a leader
+        # disconnecting does not cut off the followers.
+        self._tasks[key] = asyncio.create_task(self._pump(key, broadcast, source))
+        return broadcast
+
+    async def _pump(
+        self, key: str, broadcast: Broadcast, source: Callable[[], AsyncIterator[dict]]
+    ):
+        error = None
+        try:
+            async for event in source():
+                await broadcast.publish(event)
+        except asyncio.CancelledError:
+            error = RuntimeError("Coalesced run was cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Coalesced run for '{key}' failed: {e}", exc_info=True)
+            error = e
+        finally:
+            self._inflight.pop(key, None)
+            self._tasks.pop(key, None)
+            await broadcast.finish(error)
+
+    def stats(self) -> dict:
+        total = self.leaders + self.followers
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "coalesced_rate": round(self.followers / total, 4) if total else 0.0,
+        }
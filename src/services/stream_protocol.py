@@ -0,0 +1,86 @@
+import json
+from typing import List, Optional
+
+V1 = "v1"
+V2 = "v2"
+SSE = "sse"
+NDJSON = "ndjson"
+MEDIA_TYPES = {SSE: "text/event-stream", NDJSON: "application/x-ndjson"}
+
+
+def dumps(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def negotiate(
+    protocol: Optional[str],
+    stream_format: Optional[str],
+    protocol_header: Optional[str] = None,
+    accept: Optional[str] = None,
+) -> tuple:
+    """Stream protocol and framing for a chat request.
+
+    The request fields win over the ``X-Stream-Protocol`` and ``Accept``
+    headers. NDJSON only exists in v2, so asking for it selects v2.
+    """
+    if stream_format is None and accept and MEDIA_TYPES[NDJSON] in accept:
+        stream_format = NDJSON
+    if protocol is None and protocol_header:
+        header = protocol_header.strip().lower()
+        protocol = V2 if header in ("2", V2) else V1
+    stream_format = stream_format or SSE
+    if stream_format == NDJSON:
+        protocol = V2
+    return protocol or V1, stream_format
+
+
+class StreamEncoder:
+    """Turns ``stream_events`` payloads into wire frames.
+
+    v1 is the original SSE format: every event repeats the full reference
+    list and the stream ends with ``[DONE]``. v2 events are numbered (the SSE
+    ``id`` field, or an ``id`` key in NDJSON), list only references not sent
+    before (``refs``), and end with a ``done`` event.
+    """
+
+    def __init__(self, protocol: str = V1, stream_format: str = SSE):
+        self.protocol = protocol
+        self.stream_format = stream_format
+        self.media_type = MEDIA_TYPES[stream_format]
+        self._next_id = 0
+        self._sent_references: set = set()
+
+    def _frame(self, payload: dict) -> bytes:
+        self._next_id += 1
+        if self.stream_format == NDJSON:
+            payload["id"] = self._next_id
+            return dumps(payload) + b"\n"
+        # SSE has its own id field.
+        return b"id: %d\ndata: %s\n\n" % (self._next_id, dumps(payload))
+
+    def _new_references(self, references: List[str]) -> List[str]:
+        new = [url for url in references if url not in self._sent_references]
+        self._sent_references.update(new)
+        return new
+
+    def event(self, payload: dict) -> Optional[bytes]:
+        if self.protocol == V1:
+            return f"data: {json.dumps(payload)}\n\n".encode()
+        payload = dict(payload)
+        refs = self._new_references(payload.pop("references", None) or [])
+        if refs:
+            payload["refs"] = refs
+        if not payload:
+            # Only references that were all sent already.
+            return None
+        return self._frame(payload)
+
+    def done(self) -> bytes:
+        if self.protocol == V1:
+            return b"data: [DONE]\n\n"
+        return self._frame({"done": True})
+
+    def error(self, message: str) -> bytes:
+        if self.protocol == V1:
+            return f"data: [ERROR] {message}\n\n".encode()
+        return self._frame({"error": message})
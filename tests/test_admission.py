@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+
+from src.services.admission import Overloaded, ThreadLocks
+
+
+def test_request_beyond_max_pending_is_rejected():
+    async def main():
+        locks = ThreadLocks(max_pending=3)
+        release = await locks.acquire("t")
+        # The holder and two waiters make three pending turns.
+        waiters = [asyncio.create_task(locks.acquire("t")) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(Overloaded) as excinfo:
+            await asyncio.wait_for(locks.acquire("t"), 1)
+        assert excinfo.value.reason == "thread_busy"
+        # Other threads are not affected.
+        (await locks.acquire("other"))()
+
+        release()
+        for waiter in waiters:
+            (await waiter)()
+        assert len(locks) == 0
+
+    asyncio.run(main())
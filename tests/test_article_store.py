@@ -0,0 +1,49 @@
+import asyncio
+import os
+import tempfile
+
+from src.mcp.article_store import ArticleStore, title_key
+
+
+def _store(directory: str) -> ArticleStore:
+    return ArticleStore(os.path.join(directory, "articles.db"))
+
+
+def test_titles_differing_in_case_are_separate_articles():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        store.upsert_many(
+            [
+                {"title": "Red Dwarf", "text": "A British sitcom."},
+                {"title": "Red dwarf", "text": "A small, cool star."},
+            ]
+        )
+
+        async def text(title):
+            result = await store.lookup("get_article", {"title": title})
+            return result["text"]
+
+        assert asyncio.run(text("Red Dwarf")) == "A British sitcom."
+        assert asyncio.run(text("Red dwarf")) == "A small, cool star."
+        assert asyncio.run(text("red_dwarf")) == "A small, cool star."
+        store.close()
+
+
+def test_title_key_folds_only_the_first_letter():
+    assert title_key("  red_dwarf ") == "Red dwarf"
+    assert title_key("Red  Dwarf") == "Red Dwarf"
+
+
+def test_casefolded_keys_are_migrated():
+    with tempfile.TemporaryDirectory() as directory:
+        store = _store(directory)
+        store.upsert_many([{"title": "Red Dwarf", "text": "A British sitcom."}])
+        store._conn.execute("UPDATE articles SET key = 'red dwarf'")
+        store._conn.execute("PRAGMA user_version = 0")
+        store._conn.commit()
+        store.close()
+
+        store = _store(directory)
+        result = asyncio.run(store.lookup("get_article", {"title": "Red Dwarf"}))
+        assert result["text"] == "A British sitcom."
+        store.close()
@@ -0,0 +1,56 @@
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.agent.budget import (
+    DEADLINE,
+    MAX_TOOL_ROUNDS_CEILING,
+    TOOL_ROUNDS,
+    Budget,
+    exhausted_reason,
+)
+from src.agent.nodes.context import ContextNode
+from src.agent.state import AgentState
+
+
+def test_deadline_only_loop_stops_below_recursion_limit():
+    budget = Budget(deadline_seconds=45, max_tool_rounds=None)
+    state = AgentState(
+        messages=[], **{**budget.initial_state(), "tool_rounds": MAX_TOOL_ROUNDS_CEILING}
+    )
+    assert exhausted_reason(state) == TOOL_ROUNDS
+    # Router, the context/tools rounds and the final context and synthesize
+    # steps all fit.
+    assert budget.recursion_limit() > 2 * MAX_TOOL_ROUNDS_CEILING + 3
+
+
+def test_exhausted_keeps_references_of_last_round():
+    node = ContextNode.__new__(ContextNode)
+    state = AgentState(
+        messages=[
+            HumanMessage(content="Who wrote Red Dwarf?"),
+            AIMessage(
+                content="",
+                tool_calls=[
+                    {"name": "get_summary", "args": {"title": "Red Dwarf"}, "id": "1"}
+                ],
+            ),
+            ToolMessage(
+                content="Red Dwarf is a British sci-fi comedy ...",
+                name="get_summary",
+                tool_call_id="1",
+                artifact={"title": "Red Dwarf", "summary": "..."},
+            ),
+        ],
+        referenced_article_urls=["https://en.wikipedia.org/wiki/Rob_Grant"],
+        deadline=time.time() - 1,
+        tool_rounds=1,
+    )
+
+    update = node._exhausted(state, DEADLINE)
+
+    assert update["budget_exhausted"] == DEADLINE
+    assert update["referenced_article_urls"] == [
+        "https://en.wikipedia.org/wiki/Rob_Grant",
+        "https://en.wikipedia.org/wiki/Red_Dwarf",
+    ]
@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+from src.agent.instrumentation import instrument_node
+
+
+class SlowSyncNode:
+    def __call__(self, state):
+        time.sleep(0.3)
+        return {"done": state["n"]}
+
+
+def test_sync_node_does_not_block_event_loop():
+    node = instrument_node("slow", SlowSyncNode())
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        result = await node({"n": 1}, {})
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(main())
+    assert result == {"done": 1}
+    # The loop kept running while the node slept for 0.3 s.
+    assert ticks >= 10
+
+
+def test_async_node_is_awaited():
+    class AsyncNode:
+        async def __call__(self, state):
+            return {"done": state["n"]}
+
+    node = instrument_node("fast", AsyncNode())
+    assert asyncio.run(node({"n": 2}, {})) == {"done": 2}
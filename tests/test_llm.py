@@ -0,0 +1,23 @@
+import httpx
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.core.config import Settings
+from src.core.llm import ROLES, LLMRegistry, _httpx, _set_ollama_clients
+
+
+def test_ollama_models_share_the_registry_clients():
+    registry = LLMRegistry(Settings(ollama_base_url="http://localhost:11434"))
+    llm = registry._build(ROLES["reply"], "ollama")
+    sync_client, async_client = registry._ollama_clients()
+    assert llm._client is sync_client and llm._async_client is async_client
+    assert isinstance(_httpx(sync_client), httpx.Client)
+    assert isinstance(_httpx(async_client), httpx.AsyncClient)
+
+
+def test_missing_private_client_attributes_fail_clearly():
+    with pytest.raises(RuntimeError, match="langchain-ollama"):
+        _set_ollama_clients(FakeListChatModel(responses=[]), (None, None))
+
+    with pytest.raises(RuntimeError, match="httpx client"):
+        _httpx(object())
@@ -0,0 +1,19 @@
+import os
+
+from src.core.metrics import MetricsRegistry
+
+
+def test_samples_carry_worker_label():
+    registry = MetricsRegistry()
+    counter = registry.counter("test_total", "Test counter.", ["kind"])
+    histogram = registry.histogram("test_seconds", "Test histogram.", buckets=(1,))
+    counter.inc(kind="a")
+    histogram.observe(0.5)
+
+    worker = f'worker="{os.getpid()}"'
+    samples = [
+        line for line in registry.render().splitlines() if not line.startswith("#")
+    ]
+    assert f'test_total{{{worker},kind="a"}} 1' in samples
+    assert f'test_seconds_bucket{{{worker},le="1"}} 1' in samples
+    assert f"test_seconds_count{{{worker}}} 1" in samples
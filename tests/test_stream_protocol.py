@@ -0,0 +1,20 @@
+from src.services.stream_protocol import NDJSON, SSE, V2, StreamEncoder
+
+
+def test_v2_sse_frames_are_compact_and_numbered():
+    encoder = StreamEncoder(V2, SSE)
+    url = "https://en.wikipedia.org/wiki/Caf%C3%A9"
+    assert encoder.event({"router": "context"}) == b'id: 1\ndata: {"router":"context"}\n\n'
+    assert encoder.event({"tool": "get_summary", "references": [url]}) == (
+        b'id: 2\ndata: {"tool":"get_summary","refs":["%s"]}\n\n' % url.encode()
+    )
+    # References already sent are not repeated.
+    assert encoder.event({"references": [url]}) is None
+    assert encoder.done() == b'id: 3\ndata: {"done":true}\n\n'
+
+
+def test_v2_ndjson_keeps_non_ascii_text():
+    encoder = StreamEncoder(V2, NDJSON)
+    assert encoder.event({"content": "Café"}) == (
+        '{"content":"Café","id":1}\n'.encode()
+    )